@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: client-side JSON-RPC frame decoding on large fleet results.
+
+Builds a stdout stream of get_interfaces_many responses (a JSON text block
+plus structuredContent, as FastMCP sends them) interleaved with server log
+lines, then compares the original text-mode reader loop with the binary
+pre-checked loop using the stdlib decoder and orjson (when installed).
+
+Usage:
+  python benchmarks/bench_client_decode.py --devices 500 --frames 10 --repeat 3
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from python_mcp_client import READ_BUFFER  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+HEADER = "Interface              IP-Address      OK? Method Status                Protocol"
+
+
+def make_brief(rows: int) -> str:
+    lines = [HEADER]
+    for i in range(rows):
+        lines.append(
+            f"{'GigabitEthernet0/' + str(i):<22} 10.{i // 256 % 256}.{i % 256}.1     YES manual up                    up"
+        )
+    return "\n".join(lines)
+
+
+def make_stream(devices: int, rows: int, frames: int, noise: int) -> bytes:
+    raw = make_brief(rows)
+    payload = {
+        "command": "show ip interface brief",
+        "devices": [f"R{i}" for i in range(devices)],
+        "results": {f"R{i}": {"raw": raw, "parsed": None, "cached": False} for i in range(devices)},
+        "errors": {},
+    }
+    out = []
+    for i in range(frames):
+        frame = {
+            "jsonrpc": "2.0",
+            "id": i + 1,
+            "result": {
+                "content": [{"type": "text", "text": json.dumps(payload)}],
+                "structuredContent": payload,
+                "isError": False,
+            },
+        }
+        out.append(json.dumps(frame))
+        for j in range(noise):
+            out.append(f"2025-01-01 00:00:00,000 INFO netmiko: read_channel: line {j}")
+    return ("\n".join(out) + "\n").encode()
+
+
+def legacy_reader(data: bytes) -> int:
+    # The reader loop as it shipped: text mode, decode attempt on every line.
+    n = 0
+    for line in io.TextIOWrapper(io.BytesIO(data), encoding="utf-8"):
+        s = line.strip()
+        if not s:
+            continue
+        try:
+            msg = json.loads(s)
+        except Exception:
+            continue
+        if "id" in msg:
+            n += 1
+    return n
+
+
+def binary_reader(data: bytes, loads) -> int:
+    n = 0
+    for line in io.BufferedReader(io.BytesIO(data), READ_BUFFER):
+        s = line.strip()
+        if not s:
+            continue
+        msg = None
+        if s[:1] == b"{":
+            try:
+                msg = loads(s)
+            except Exception:
+                pass
+        if isinstance(msg, dict) and "id" in msg:
+            n += 1
+    return n
+
+
+def bench(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--devices", type=int, default=500)
+    ap.add_argument("--rows", type=int, default=20, help="interfaces per device")
+    ap.add_argument("--frames", type=int, default=10)
+    ap.add_argument("--noise", type=int, default=200, help="log lines after each frame")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    data = make_stream(args.devices, args.rows, args.frames, args.noise)
+    mb = len(data) / 1e6
+    print(f"stream: {mb:.1f} MB, {args.frames} frames, {args.frames * args.noise} log lines")
+
+    cases = [
+        ("legacy text + json.loads", lambda: legacy_reader(data)),
+        ("binary + json.loads", lambda: binary_reader(data, json.loads)),
+    ]
+    if orjson is not None:
+        cases.append(("binary + orjson.loads", lambda: binary_reader(data, orjson.loads)))
+    else:
+        print("orjson not installed; skipping")
+
+    base = None
+    for label, fn in cases:
+        assert fn() == args.frames
+        t = bench(fn, args.repeat)
+        base = base or t
+        print(f"{label:<28} {t * 1000:9.1f} ms  {mb / t:8.1f} MB/s  x{base / t:.2f}")
+
+
+if __name__ == "__main__":
+    main()
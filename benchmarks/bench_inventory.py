@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: time to load a large synthetic inventory with each loader.
+
+Compares the pure-Python YAML loader, libyaml's CSafeLoader (what
+load_inventory uses when available), a warm pickled snapshot
+(load_inventory_snapshot) and a warm SQLite store (open_inventory with a db).
+
+Usage:
+  python benchmarks/bench_inventory.py --devices 12000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import yaml  # noqa: E402
+
+import mcp_server  # noqa: E402
+
+
+def write_inventory(path: str, count: int) -> None:
+    devices = {
+        f"R{i:05d}": {
+            "host": f"10.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}",
+            "username": "admin",
+            "password": "C1sc0123!",
+            "secret": "C1sc0123!",
+            "port": 22,
+            "site": f"dc{i % 4}",
+            "tags": ["edge"] if i % 10 == 0 else ["core"],
+        }
+        for i in range(count)
+    }
+    with open(path, "w") as f:
+        yaml.safe_dump({"devices": devices, "groups": {"first": list(devices)[:10]}}, f, sort_keys=False)
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _parse_args():
+    p = argparse.ArgumentParser(description="Benchmark inventory cold/warm start.")
+    p.add_argument("--devices", type=int, default=12000, help="Devices in the synthetic inventory (default: 12000)")
+    p.add_argument("--repeat", type=int, default=3, help="Timed runs per loader; best is reported (default: 3)")
+    return p.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "devices.yaml")
+        db_path = os.path.join(tmp, "devices.db")
+        write_inventory(path, args.devices)
+        print(f"{args.devices} devices, {os.path.getsize(path) / 1e6:.2f} MB of YAML, best of {args.repeat}")
+
+        def pure_python():
+            with open(path) as f:
+                yaml.load(f, Loader=yaml.SafeLoader)
+
+        # prime the snapshot and the SQLite store so the timed runs are warm starts
+        mcp_server.load_inventory_snapshot(path)
+        mcp_server.open_inventory(path, db_path)
+
+        rows = [("yaml.SafeLoader (before)", pure_python)]
+        if hasattr(yaml, "CSafeLoader"):
+            rows.append(("load_inventory (CSafeLoader)", lambda: mcp_server.load_inventory(path)))
+        else:
+            print("  (libyaml not available; load_inventory falls back to SafeLoader)")
+        rows += [
+            ("snapshot, warm", lambda: mcp_server.load_inventory_snapshot(path)),
+            ("sqlite store, warm", lambda: mcp_server.open_inventory(path, db_path)),
+        ]
+        baseline = None
+        for label, fn in rows:
+            best = timed(fn, args.repeat)
+            baseline = baseline or best
+            print(f"  {label:<30} {best * 1e3:9.1f} ms  {baseline / best:7.1f}x")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: prompt-anchored send_command vs netmiko's default.
+
+Drives a real netmiko CiscoIosSSH session over an in-process mock channel
+that answers like an IOS device after a configurable round-trip time. The
+default path lets send_command re-read the prompt before every command; the
+anchored path (mcp_server.send_command after anchor_prompt) reads up to the
+prompt cached at login.
+
+Usage:
+  python benchmarks/bench_prompt_anchor.py --rtt-ms 20 --rows 2000 --repeat 10
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from netmiko.channel import Channel  # noqa: E402
+from netmiko.cisco.cisco_ios import CiscoIosSSH  # noqa: E402
+
+import mcp_server  # noqa: E402
+
+HEADER = "Interface              IP-Address      OK? Method Status                Protocol"
+VERSION = (
+    "Cisco IOS XE Software, Version 17.03.04a\n"
+    "Cisco IOS Software [Amsterdam], Virtual XE Software (X86_64_LINUX_IOSD-UNIVERSALK9-M), "
+    "Version 17.3.4a, RELEASE SOFTWARE (fc3)\n"
+    "R1 uptime is 2 weeks, 3 days, 4 hours, 5 minutes\n"
+)
+
+
+def make_brief(rows: int) -> str:
+    lines = [HEADER]
+    for i in range(rows):
+        lines.append(f"{'GigabitEthernet0/0.' + str(i):<22} 10.{i // 256 % 256}.{i % 256}.1     YES manual up                    up")
+    return "\n".join(lines)
+
+
+class MockChannel(Channel):
+    """
+    An IOS-like exec session: echoes each line, then answers with the
+    command's output and the prompt once ``rtt`` (plus transfer time at
+    ``bytes_per_s``) has passed.
+    """
+
+    def __init__(self, outputs: dict, rtt: float, bytes_per_s: float, hostname: str = "R1"):
+        self.outputs = outputs
+        self.rtt = rtt
+        self.bytes_per_s = bytes_per_s
+        self.prompt = hostname + "#"
+        self._pending = []
+        self._partial = ""
+
+    def write_channel(self, out_data: str) -> None:
+        self._partial += out_data
+        while "\n" in self._partial:
+            line, self._partial = self._partial.split("\n", 1)
+            line = line.rstrip("\r")
+            now = time.monotonic()
+            if not line.strip():
+                self._pending.append((now + self.rtt, "\n" + self.prompt))
+                continue
+            out = self.outputs.get(line.strip(), "")
+            self._pending.append((now + self.rtt / 2, line + "\n"))
+            ready = now + self.rtt + len(out) / self.bytes_per_s
+            self._pending.append((ready, (out + "\n" if out else "") + self.prompt))
+
+    def read_buffer(self) -> str:
+        return ""
+
+    def read_channel(self) -> str:
+        now = time.monotonic()
+        ready = [d for t, d in self._pending if t <= now]
+        self._pending = [(t, d) for t, d in self._pending if t > now]
+        return "".join(ready)
+
+
+def session(outputs: dict, rtt: float, bytes_per_s: float) -> CiscoIosSSH:
+    conn = CiscoIosSSH(host="mock", username="u", password="p", auto_connect=False, fast_cli=True)
+    conn.channel = MockChannel(outputs, rtt, bytes_per_s)
+    conn.session_preparation()  # terminal width/length + base prompt, as at login
+    mcp_server.anchor_prompt(conn)
+    return conn
+
+
+def bench(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return times[len(times) // 2]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rtt-ms", type=float, default=20.0)
+    ap.add_argument("--rows", type=int, default=2000, help="rows of the large 'show ip interface brief'")
+    ap.add_argument("--mbps", type=float, default=8.0, help="simulated link throughput in Mbit/s")
+    ap.add_argument("--repeat", type=int, default=10)
+    args = ap.parse_args()
+
+    outputs = {"show version": VERSION, "show ip interface brief": make_brief(args.rows)}
+    conn = session(outputs, args.rtt_ms / 1000, args.mbps * 1e6 / 8)
+    print(f"rtt {args.rtt_ms:g} ms, {args.mbps:g} Mbit/s, brief: {args.rows} rows; median of {args.repeat}")
+    for command in outputs:
+        default = conn.send_command(command)
+        anchored = mcp_server.send_command(conn, command)
+        assert default == anchored, f"outputs differ for {command!r}"
+        t_default = bench(lambda: conn.send_command(command), args.repeat)
+        t_anchored = bench(lambda: mcp_server.send_command(conn, command), args.repeat)
+        print(
+            f"{command:<26} default {t_default * 1000:8.1f} ms   anchored {t_anchored * 1000:8.1f} ms"
+            f"   x{t_default / t_anchored:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Start-up benchmark for mcp_server.py, checked against a budget.
+
+Measures:
+  * `python -X importtime -c "import mcp_server"`: the heaviest top-level
+    imports, and whether netmiko/paramiko were pulled in (they should load
+    on the first connection, not at import);
+  * wall-clock import time of mcp_server above a bare FastMCP import
+    (the part this module controls);
+  * time from spawning the server to its `initialize` response.
+
+Exits non-zero when a lazily-loaded module is imported at start-up or the
+import overhead exceeds --budget-ms.
+
+Usage:
+  python benchmarks/bench_startup.py --runs 7 --budget-ms 150
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+LAZY_MODULES = ("netmiko", "paramiko", "scp", "textfsm", "serial")
+BASELINE = "from fastmcp import Context, FastMCP"
+
+
+def wall(codes, runs: int):
+    # alternate the snippets so machine noise hits them alike; best of N each
+    best = [float("inf")] * len(codes)
+    for _ in range(runs):
+        for i, code in enumerate(codes):
+            t0 = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True)
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return best
+
+
+def importtime(top: int):
+    probe = "import sys, mcp_server; print(' '.join(m for m in %r if m in sys.modules))" % (LAZY_MODULES,)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("   ") and not name.startswith("    "):  # direct imports of mcp_server
+            rows.append((int(cumulative), name.strip()))
+    rows.sort(reverse=True)
+    return rows[:top], proc.stdout.split()
+
+
+def time_to_initialize(inventory: str, runs: int) -> float:
+    req = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-03-26",
+            "capabilities": {},
+            "clientInfo": {"name": "bench", "version": "1"},
+        },
+    }
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "mcp_server.py", "--inventory", inventory, "--watch-interval", "0"],
+            cwd=ROOT,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            proc.stdin.write((json.dumps(req) + "\n").encode())
+            proc.stdin.flush()
+            for line in proc.stdout:
+                if line.startswith(b"{") and json.loads(line).get("id") == 1:
+                    break
+            times.append(time.perf_counter() - t0)
+        finally:
+            proc.kill()
+            proc.wait()
+    return min(times)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=7, help="best of N timings")
+    ap.add_argument("--top", type=int, default=8, help="heaviest imports to list")
+    ap.add_argument("--inventory", default="devices.yaml")
+    ap.add_argument(
+        "--budget-ms",
+        type=float,
+        default=150.0,
+        help="max import time of mcp_server above a bare FastMCP import (default: 150)",
+    )
+    args = ap.parse_args()
+
+    heaviest, loaded = importtime(args.top)
+    print("heaviest imports (cumulative):")
+    for us, name in heaviest:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    base, full = wall([BASELINE, "import mcp_server"], args.runs)
+    overhead = (full - base) * 1000
+    print(f"import fastmcp baseline: {base * 1000:7.1f} ms")
+    print(f"import mcp_server:       {full * 1000:7.1f} ms  (+{overhead:.1f} ms, budget {args.budget_ms:g} ms)")
+    print(f"spawn -> initialize:     {time_to_initialize(args.inventory, args.runs) * 1000:7.1f} ms")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: imported at start-up, should be lazy: {', '.join(loaded)}")
+        failed = True
+    if overhead > args.budget_ms:
+        print("FAIL: start-up import budget exceeded")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,120 +5,1835 @@ Cisco Simple Interface MCP (YAML-backed inventory)
 Requires:
   pip install fastmcp netmiko pyyaml
 
+netmiko and PyYAML are imported on first use (first connection / first
+inventory parse), so the server answers `initialize` without paying for them.
+
 Usage:
   python server.py --inventory devices.yaml
+  python server.py --inventory devices.yaml --inventory-db devices.db   # large inventories
 """
 from __future__ import annotations
 
-import argparse
-import ipaddress
-import os
-import re
-from typing import List, Dict, Any, Optional
+import argparse
+import asyncio
+import functools
+import hashlib
+import ipaddress
+import json
+import logging
+import math
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from typing import Awaitable, Callable, Hashable, List, Dict, Any, Optional, Tuple, Union
+
+from fastmcp import Context, FastMCP
+from fastmcp.server.middleware import Middleware
+
+# -----------------------------------------
+# MCP App
+# -----------------------------------------
+@asynccontextmanager
+async def _lifespan(server):
+    # the event loop is running; see the Session Pre-warm section
+    asyncio.get_running_loop().call_later(PREWARM_FALLBACK_DELAY, start_prewarm)
+    yield {}
+
+
+mcp = FastMCP("Cisco Simple Interface MCP (YAML Inventory)", lifespan=_lifespan)
+# stdout carries the MCP protocol; anything we log goes to stderr
+log = logging.getLogger("cisco_mcp")
+
+# -----------------------------------------
+# Inventory Loading
+# -----------------------------------------
+INVENTORY_PATH: str = "devices.yaml"
+# Optional SQLite store compiled from INVENTORY_PATH (see open_inventory)
+INVENTORY_DB_PATH: Optional[str] = None
+# Reuse a pickled parse of INVENTORY_PATH while its content is unchanged
+INVENTORY_SNAPSHOT: bool = True
+
+
+@functools.lru_cache(maxsize=None)
+def _yaml_loader():
+    # imported here, not at module level, to keep server start-up light;
+    # libyaml's C loader is several times faster, fall back when PyYAML lacks it
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+# Netmiko timing settings accepted in `timing_profiles.<device_type>` and a
+# device's own `timing:`; see device_timing for how they combine.
+TIMING_KEYS: Dict[str, tuple] = {
+    "global_delay_factor": (int, float),
+    "read_timeout": (int, float),
+    "conn_timeout": (int, float),
+    "fast_cli": (bool,),
+    "prompt_pattern": (str,),
+}
+
+
+def _check_timing(where: str, timing: Any) -> Dict[str, Any]:
+    if timing is None:
+        return {}
+    if not isinstance(timing, dict):
+        raise ValueError(f"{where}: timing must be a mapping.")
+    for key, value in timing.items():
+        types = TIMING_KEYS.get(key)
+        if types is None:
+            raise ValueError(f"{where}: unknown timing setting '{key}' (expected {', '.join(TIMING_KEYS)}).")
+        if not isinstance(value, types) or (isinstance(value, bool) and bool not in types):
+            raise ValueError(f"{where}: timing '{key}' has the wrong type.")
+        if key == "prompt_pattern":
+            try:
+                re.compile(value)
+            except re.error as e:
+                raise ValueError(f"{where}: invalid prompt_pattern: {e}") from None
+    return dict(timing)
+
+
+# bump whenever load_inventory's output changes for the same YAML (new
+# normalization or merging), so stored snapshots and SQLite stores are rebuilt
+INVENTORY_FORMAT_VERSION = 1
+
+
+def load_inventory(path: str) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[str]]]:
+    """
+    Parse the YAML inventory into (devices, groups).
+
+    A device's ``timing`` is stored already merged over the timing profile of
+    its device_type (top-level ``timing_profiles``).
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Inventory file not found: {path}")
+    import yaml
+
+    with open(path, "r") as f:
+        data = yaml.load(f, Loader=_yaml_loader()) or {}
+    devices = data.get("devices") or {}
+    if not isinstance(devices, dict) or not devices:
+        raise ValueError("Inventory must contain a top-level 'devices' mapping with at least one device.")
+    profiles = data.get("timing_profiles") or {}
+    if not isinstance(profiles, dict):
+        raise ValueError("Inventory 'timing_profiles' must be a mapping of device_type to timing settings.")
+    profiles = {dt: _check_timing(f"Timing profile '{dt}'", p) for dt, p in profiles.items()}
+    # Basic normalization
+    for name, d in devices.items():
+        if "host" not in d or "username" not in d or "password" not in d:
+            raise ValueError(f"Device '{name}' must include 'host', 'username', and 'password'.")
+        d.setdefault("port", 22)
+        d.setdefault("device_type", "cisco_ios")
+        tags = d.get("tags") or []
+        if isinstance(tags, dict):
+            # {role: edge} is stored as the tag "role=edge"
+            tags = [f"{k}={v}" for k, v in tags.items()]
+        if not isinstance(tags, list) or not all(isinstance(t, str) for t in tags):
+            raise ValueError(f"Device '{name}': 'tags' must be a list of strings or a key: value mapping.")
+        d["tags"] = tags
+        if d.get("site") is not None and not isinstance(d["site"], str):
+            raise ValueError(f"Device '{name}': 'site' must be a string.")
+        d["timing"] = {**profiles.get(d["device_type"], {}), **_check_timing(f"Device '{name}'", d.get("timing"))}
+    groups = data.get("groups") or {}
+    if not isinstance(groups, dict):
+        raise ValueError("Inventory 'groups' must be a mapping of group name to a list of devices.")
+    for group, members in groups.items():
+        if not isinstance(members, list):
+            raise ValueError(f"Group '{group}' must be a list of device names.")
+        unknown = [m for m in members if m not in devices]
+        if unknown:
+            raise ValueError(f"Group '{group}' references unknown devices: {', '.join(map(str, unknown))}")
+    return devices, groups
+
+
+def _snapshot_path(path: str) -> str:
+    return path + ".pickle"
+
+
+def load_inventory_snapshot(
+    path: str, source_hash: Optional[str] = None
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, List[str]]]:
+    """
+    load_inventory() through a pickled snapshot stored next to ``path``.
+
+    The snapshot is keyed by the YAML's SHA-256 and INVENTORY_FORMAT_VERSION:
+    while both are unchanged it is loaded instead of parsing YAML, otherwise
+    the YAML is parsed and the snapshot rewritten. It holds credentials just like the
+    YAML, so it is written owner-readable only.
+    """
+    source_hash = source_hash or _file_sha256(path)
+    snap = _snapshot_path(path)
+    try:
+        with open(snap, "rb") as f:
+            cached = pickle.load(f)
+        if cached.get("sha256") == source_hash and cached.get("format") == INVENTORY_FORMAT_VERSION:
+            return cached["devices"], cached["groups"]
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        log.warning("Ignoring unreadable inventory snapshot %s: %s", snap, e)
+
+    devices, groups = load_inventory(path)
+    tmp = snap + ".tmp"
+    try:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(
+                {"sha256": source_hash, "format": INVENTORY_FORMAT_VERSION, "devices": devices, "groups": groups}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, snap)
+    except OSError as e:
+        log.warning("Could not write inventory snapshot %s: %s", snap, e)
+    return devices, groups
+
+
+def default_device_name() -> str:
+    # First device in the inventory
+    ensure_inventory()
+    return DEVICES.default_name()
+
+
+# -----------------------------------------
+# Selectors
+# -----------------------------------------
+# A selector picks devices by attribute, e.g. "site=dc1 and role=edge":
+#   key=value / key!=value   site, device_type, host, name and group compare
+#                            against the device (or group membership); any
+#                            other key matches the tag "key=value"
+#   word                     matches the plain tag "word"
+#   and / or / not / ( )     usual precedence: not > and > or
+SELECTOR_ATTRS = frozenset(("site", "device_type", "host", "name"))
+_SELECTOR_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<paren>[()])"
+    r"|(?P<key>[^\s()=!]+)\s*(?P<op>!=|=)\s*(?P<value>[^\s()]+)"
+    r"|(?P<word>[^\s()=!]+))"
+)
+
+
+@functools.lru_cache(maxsize=256)
+def parse_selector(text: str) -> tuple:
+    """
+    Parse a selector into a small AST of nested tuples:
+    ("or"|"and", a, b), ("not", a) or ("term", key, value).
+    """
+    tokens: List[Tuple[str, ...]] = []
+    text = text.strip()
+    pos = 0
+    while pos < len(text):
+        m = _SELECTOR_TOKEN_RE.match(text, pos)
+        if not m:
+            raise ValueError(f"Invalid selector near: {text[pos:]!r}")
+        if m.group("paren"):
+            tokens.append((m.group("paren"),))
+        elif m.group("key"):
+            tokens.append(("term", m.group("key"), m.group("op"), m.group("value")))
+        else:
+            word = m.group("word")
+            tokens.append((word.lower(),) if word.lower() in ("and", "or", "not") else ("word", word))
+        pos = m.end()
+    if not tokens:
+        raise ValueError("Selector is empty.")
+
+    def peek() -> Optional[str]:
+        return tokens[0][0] if tokens else None
+
+    def take() -> Tuple[str, ...]:
+        if not tokens:
+            raise ValueError(f"Selector ends unexpectedly: {text!r}")
+        return tokens.pop(0)
+
+    def parse_or() -> tuple:
+        node = parse_and()
+        while peek() == "or":
+            take()
+            node = ("or", node, parse_and())
+        return node
+
+    def parse_and() -> tuple:
+        node = parse_not()
+        while peek() == "and":
+            take()
+            node = ("and", node, parse_not())
+        return node
+
+    def parse_not() -> tuple:
+        if peek() == "not":
+            take()
+            return ("not", parse_not())
+        return parse_atom()
+
+    def parse_atom() -> tuple:
+        tok = take()
+        if tok[0] == "(":
+            node = parse_or()
+            if take()[0] != ")":
+                raise ValueError(f"Missing ')' in selector: {text!r}")
+            return node
+        if tok[0] == "term":
+            _, key, op, value = tok
+            term = ("term", key, value)
+            return ("not", term) if op == "!=" else term
+        if tok[0] == "word":
+            return ("term", "tag", tok[1])
+        raise ValueError(f"Unexpected {tok[0]!r} in selector: {text!r}")
+
+    node = parse_or()
+    if tokens:
+        raise ValueError(f"Unexpected {tokens[0][-1]!r} in selector: {text!r}")
+    return node
+
+
+def _selector_key(key: str, value: str) -> Tuple[str, str]:
+    # attribute and group lookups stay as-is; anything else is a tag
+    if key in SELECTOR_ATTRS or key in ("tag", "group"):
+        return key, value
+    return "tag", f"{key}={value}"
+
+
+def eval_selector(node: tuple, lookup: Callable[[str, str], set], universe: Callable[[], set]) -> set:
+    """
+    Evaluate a parsed selector with set algebra over index lookups.
+    ``lookup(key, value)`` returns the matching inventory positions and
+    ``universe()`` all positions (only needed for "not").
+    """
+    kind = node[0]
+    if kind == "term":
+        return lookup(*_selector_key(node[1], node[2]))
+    if kind == "not":
+        return universe() - eval_selector(node[1], lookup, universe)
+    left = eval_selector(node[1], lookup, universe)
+    if kind == "and" and not left:
+        return left
+    right = eval_selector(node[2], lookup, universe)
+    return left & right if kind == "and" else left | right
+
+
+# -----------------------------------------
+# Inventory Backends
+# -----------------------------------------
+# DEVICES is a read-only mapping of name -> device dict in inventory (YAML)
+# order. Both backends also answer default_name(), select() and page(), the
+# latter with an opaque cursor: the inventory position of the last name
+# returned. Selector terms resolve through indexes keyed by (attribute,
+# value) that map to inventory positions, so picking a group or site never
+# walks the whole inventory.
+class MemoryInventory(Mapping):
+    """
+    Inventory parsed from YAML and held in memory.
+    """
+
+    def __init__(self, devices: Dict[str, Dict[str, Any]], groups: Optional[Dict[str, List[str]]] = None):
+        self._devices = devices
+        self._names = list(devices)
+        self._groups = groups or {}
+        self._index: Optional[Dict[Tuple[str, str], set]] = None
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        return self._devices[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._devices
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def default_name(self) -> str:
+        return self._names[0]
+
+    def _lookup(self, key: str, value: str) -> set:
+        if self._index is None:
+            # built on first use and kept for the life of this inventory
+            index: Dict[Tuple[str, str], set] = {}
+            positions = {}
+            for pos, (name, d) in enumerate(self._devices.items()):
+                positions[name] = pos
+                index.setdefault(("name", name), set()).add(pos)
+                for attr in ("site", "device_type", "host"):
+                    if d.get(attr) is not None:
+                        index.setdefault((attr, str(d[attr])), set()).add(pos)
+                for tag in d.get("tags") or ():
+                    index.setdefault(("tag", tag), set()).add(pos)
+            for grp, members in self._groups.items():
+                index[("group", grp)] = {positions[n] for n in members}
+            self._index = index
+        return self._index.get((key, value), set())
+
+    def _positions(self, selector: Optional[str]) -> Optional[set]:
+        if not selector:
+            return None
+        return eval_selector(parse_selector(selector), self._lookup, lambda: set(range(len(self._names))))
+
+    def select(self, selector: str) -> List[str]:
+        return [self._names[pos] for pos in sorted(self._positions(selector))]
+
+    def page(
+        self,
+        prefix: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        selector: Optional[str] = None,
+    ) -> Tuple[List[str], Optional[str]]:
+        start = int(cursor) + 1 if cursor else 0
+        allowed = self._positions(selector)
+        if tag:
+            tagged = self._lookup("tag", tag)
+            allowed = tagged if allowed is None else allowed & tagged
+        candidates = range(start, len(self._names)) if allowed is None else sorted(p for p in allowed if p >= start)
+        names: List[str] = []
+        last = start - 1  # position the next page starts after
+        for pos in candidates:
+            name = self._names[pos]
+            if prefix and not name.startswith(prefix):
+                continue
+            if limit is not None and len(names) == limit:
+                return names, str(last)
+            names.append(name)
+            last = pos
+        return names, None
+
+    def prewarm_names(self) -> List[str]:
+        return [name for name, d in self._devices.items() if d.get("prewarm")]
+
+
+# bump when SQLITE_INVENTORY_SCHEMA changes, so existing stores get rebuilt
+SQLITE_INVENTORY_VERSION = 2
+SQLITE_INVENTORY_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE devices (
+    pos INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    host TEXT NOT NULL,
+    device_type TEXT NOT NULL,
+    site TEXT,
+    prewarm INTEGER NOT NULL DEFAULT 0,
+    record TEXT NOT NULL
+);
+CREATE INDEX devices_host ON devices (host);
+CREATE INDEX devices_device_type ON devices (device_type);
+CREATE INDEX devices_site ON devices (site);
+CREATE INDEX devices_prewarm ON devices (pos) WHERE prewarm = 1;
+CREATE TABLE device_tags (tag TEXT NOT NULL, pos INTEGER NOT NULL, PRIMARY KEY (tag, pos)) WITHOUT ROWID;
+CREATE TABLE groups (grp TEXT NOT NULL, idx INTEGER NOT NULL, name TEXT NOT NULL, PRIMARY KEY (grp, idx));
+"""
+
+
+class SqliteInventory(Mapping):
+    """
+    Inventory served from a SQLite file compiled from the YAML inventory.
+
+    Device records (credentials included) are read per lookup and not kept in
+    memory; names, tags, host, device_type, site and the prewarm flag are
+    indexed.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._len = self._query("SELECT COUNT(*) FROM devices")[0][0]
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        rows = self._query("SELECT record FROM devices WHERE name = ?", (name,))
+        if not rows:
+            raise KeyError(name)
+        return json.loads(rows[0][0])
+
+    def __contains__(self, name) -> bool:
+        return bool(self._query("SELECT 1 FROM devices WHERE name = ?", (name,)))
+
+    def __iter__(self):
+        return iter([r[0] for r in self._query("SELECT name FROM devices ORDER BY pos")])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __del__(self):
+        # sqlite3 connections sit in a reference cycle and would otherwise
+        # hold their file open until a cyclic GC pass; close with the last
+        # reference instead (e.g. once calls on a replaced inventory finish)
+        if getattr(self, "_db", None) is not None:
+            self._db.close()
+
+    def default_name(self) -> str:
+        rows = self._query("SELECT name FROM devices ORDER BY pos LIMIT 1")
+        if not rows:
+            raise ValueError("Inventory is empty.")
+        return rows[0][0]
+
+    def prewarm_names(self) -> List[str]:
+        return [r[0] for r in self._query("SELECT name FROM devices WHERE prewarm = 1 ORDER BY pos")]
+
+    def groups(self) -> Dict[str, List[str]]:
+        groups: Dict[str, List[str]] = {}
+        for grp, name in self._query("SELECT grp, name FROM groups ORDER BY grp, idx"):
+            groups.setdefault(grp, []).append(name)
+        return groups
+
+    def _lookup(self, key: str, value: str) -> set:
+        if key in SELECTOR_ATTRS:
+            # key is from a fixed whitelist of indexed columns
+            rows = self._query(f"SELECT pos FROM devices WHERE {key} = ?", (value,))
+        elif key == "group":
+            rows = self._query(
+                "SELECT d.pos FROM groups g JOIN devices d ON d.name = g.name WHERE g.grp = ?", (value,)
+            )
+        else:
+            rows = self._query("SELECT pos FROM device_tags WHERE tag = ?", (value,))
+        return {r[0] for r in rows}
+
+    def _positions(self, selector: Optional[str]) -> Optional[set]:
+        if not selector:
+            return None
+        return eval_selector(
+            parse_selector(selector),
+            self._lookup,
+            lambda: {r[0] for r in self._query("SELECT pos FROM devices")},
+        )
+
+    def select(self, selector: str) -> List[str]:
+        return self.page(selector=selector)[0]
+
+    def page(
+        self,
+        prefix: Optional[str] = None,
+        tag: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        selector: Optional[str] = None,
+    ) -> Tuple[List[str], Optional[str]]:
+        sql = "SELECT d.pos, d.name FROM devices d"
+        after = int(cursor) if cursor else -1
+        where, params = ["d.pos > ?"], [after]
+        if tag:
+            sql += " JOIN device_tags t ON t.pos = d.pos AND t.tag = ?"
+            params.insert(0, tag)
+        allowed = self._positions(selector)
+        if allowed is not None:
+            where.append("d.pos IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(sorted(allowed)))
+        if prefix:
+            # range scan on the name index; LIKE would be case-insensitive and unindexed
+            where += ["d.name >= ?", "d.name < ?"]
+            params += [prefix, prefix + "\U0010ffff"]
+        sql += " WHERE " + " AND ".join(where) + " ORDER BY d.pos"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit) + 1)
+        rows = self._query(sql, tuple(params))
+        if limit is not None and len(rows) > limit:
+            rows = rows[:limit]
+            return [r[1] for r in rows], str(rows[-1][0] if rows else after)
+        return [r[1] for r in rows], None
+
+
+def _file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_inventory_db(yaml_path: str, db_path: str, source_hash: Optional[str] = None) -> None:
+    """
+    Compile the YAML inventory into a SQLite file. The file is written next
+    to ``db_path`` and renamed into place, so readers never see it half-built.
+    It holds credentials just like the YAML, so it is created owner-readable
+    only.
+    """
+    devices, groups = load_inventory(yaml_path)
+    tmp = db_path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    # SQLite opens the empty file as a new database and keeps its mode
+    os.close(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+    db = sqlite3.connect(tmp)
+    try:
+        with db:
+            db.executescript(SQLITE_INVENTORY_SCHEMA)
+            db.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                (
+                    ("schema_version", str(SQLITE_INVENTORY_VERSION)),
+                    ("format_version", str(INVENTORY_FORMAT_VERSION)),
+                    ("source_sha256", source_hash or _file_sha256(yaml_path)),
+                ),
+            )
+            db.executemany(
+                "INSERT INTO devices VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        pos,
+                        name,
+                        d["host"],
+                        d["device_type"],
+                        d.get("site"),
+                        1 if d.get("prewarm") else 0,
+                        json.dumps(d),
+                    )
+                    for pos, (name, d) in enumerate(devices.items())
+                ),
+            )
+            db.executemany(
+                "INSERT INTO device_tags VALUES (?, ?)",
+                {(tag, pos) for pos, d in enumerate(devices.values()) for tag in d["tags"]},
+            )
+            db.executemany(
+                "INSERT INTO groups VALUES (?, ?, ?)",
+                ((grp, idx, name) for grp, members in groups.items() for idx, name in enumerate(members)),
+            )
+    finally:
+        db.close()
+    os.replace(tmp, db_path)
+
+
+def _inventory_db_hash(db_path: str) -> Optional[str]:
+    # None (rebuild) for a missing or unreadable store, an older schema or
+    # records normalized by an older load_inventory
+    try:
+        db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            meta = dict(db.execute("SELECT key, value FROM meta").fetchall())
+        finally:
+            db.close()
+    except sqlite3.Error:
+        return None
+    if meta.get("schema_version") != str(SQLITE_INVENTORY_VERSION) or meta.get("format_version") != str(
+        INVENTORY_FORMAT_VERSION
+    ):
+        return None
+    return meta.get("source_sha256")
+
+
+def open_inventory(path: str, db_path: Optional[str] = None) -> Tuple[Mapping, Dict[str, List[str]]]:
+    """
+    Open the inventory as (devices, groups).
+
+    Without ``db_path`` the YAML (or its pickled snapshot, see
+    load_inventory_snapshot) is loaded into a MemoryInventory. With it, the
+    SQLite store is (re)built only when the YAML content changed since it was
+    compiled. Either way, large inventories start without parsing YAML.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Inventory file not found: {path}")
+    if not db_path:
+        if INVENTORY_SNAPSHOT:
+            devices, groups = load_inventory_snapshot(path)
+        else:
+            devices, groups = load_inventory(path)
+        return MemoryInventory(devices, groups), groups
+    source_hash = _file_sha256(path)
+    if _inventory_db_hash(db_path) != source_hash:
+        build_inventory_db(path, db_path, source_hash)
+    inv = SqliteInventory(db_path)
+    return inv, inv.groups()
+
+
+DEVICES: Mapping = MemoryInventory({})
+GROUPS: Dict[str, List[str]] = {}
+
+# (path, db_path) still to be opened by ensure_inventory, see defer_inventory
+_DEFERRED_INVENTORY: Optional[Tuple[str, Optional[str]]] = None
+_INVENTORY_LOCK = threading.Lock()
+
+
+def defer_inventory(path: str, db_path: Optional[str] = None) -> None:
+    """
+    Open the inventory on first use instead of now, so start-up does not wait
+    on YAML/SQLite. Errors (e.g. an invalid file) surface on that first call.
+    """
+    global _DEFERRED_INVENTORY
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Inventory file not found: {path}")
+    _DEFERRED_INVENTORY = (path, db_path)
+
+
+def ensure_inventory() -> None:
+    global DEVICES, GROUPS, _DEFERRED_INVENTORY
+    if _DEFERRED_INVENTORY is None:
+        return
+    with _INVENTORY_LOCK:
+        if _DEFERRED_INVENTORY is not None:
+            DEVICES, GROUPS = open_inventory(*_DEFERRED_INVENTORY)
+            _DEFERRED_INVENTORY = None
+
+
+class OpenInventoryFirst(Middleware):
+    """
+    Open a deferred inventory on a worker thread before a tool runs, so the
+    first call (or one waiting on the pre-warm thread's open) does not block
+    the event loop for every other request; tools then find it open.
+    """
+
+    async def on_call_tool(self, context, call_next):
+        if _DEFERRED_INVENTORY is not None:
+            await asyncio.get_running_loop().run_in_executor(None, ensure_inventory)
+        return await call_next(context)
+
+
+mcp.add_middleware(OpenInventoryFirst())
+
+
+# -----------------------------------------
+# Timing Profiles
+# -----------------------------------------
+# Effective Netmiko timing for a device, later entries winning:
+#   TIMING_DEFAULTS < timing_profiles[device_type] < device `timing:`
+#   < calibrate_timing result saved in <inventory>.timing.json
+TIMING_DEFAULTS: Dict[str, Any] = {"conn_timeout": 8, "fast_cli": True}
+
+_CALIBRATED: Optional[Dict[str, Dict[str, Any]]] = None
+_CALIBRATED_LOCK = threading.Lock()
+
+
+def _timing_store_path() -> str:
+    return INVENTORY_PATH + ".timing.json"
+
+
+def calibrated_timing() -> Dict[str, Dict[str, Any]]:
+    global _CALIBRATED
+    with _CALIBRATED_LOCK:
+        if _CALIBRATED is None:
+            try:
+                with open(_timing_store_path()) as f:
+                    data = json.load(f)
+                _CALIBRATED = {
+                    name: _check_timing(f"Calibrated timing for '{name}'", t) for name, t in data.items()
+                }
+            except FileNotFoundError:
+                _CALIBRATED = {}
+            except Exception as e:
+                log.warning("Ignoring calibrated timing store %s: %s", _timing_store_path(), e)
+                _CALIBRATED = {}
+        return _CALIBRATED
+
+
+def save_calibrated_timing(name: str, timing: Dict[str, Any]) -> str:
+    """Record ``timing`` for device ``name`` and rewrite the store atomically."""
+    global _CALIBRATED
+    store = dict(calibrated_timing())
+    store[name] = _check_timing(f"Calibrated timing for '{name}'", timing)
+    path = _timing_store_path()
+    with _CALIBRATED_LOCK:
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(store, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+        _CALIBRATED = store
+    return path
+
+
+def device_timing(name: str) -> Dict[str, Any]:
+    return {**TIMING_DEFAULTS, **(DEVICES[name].get("timing") or {}), **calibrated_timing().get(name, {})}
+
+
+def timing_from_measurements(prompt_rtt: float, show_seconds: float, prompt: str) -> Dict[str, Any]:
+    """
+    Derive a timing profile from a measured prompt round trip and the time
+    'show version' took. Netmiko's delay factor 1.0 is sized for roughly a
+    100 ms round trip, so it scales from there; timeouts keep a wide margin.
+    """
+    base = prompt.strip().rstrip("#>")
+    return {
+        "global_delay_factor": round(min(4.0, max(0.1, prompt_rtt / 0.1)), 2),
+        "conn_timeout": int(min(60, max(5, math.ceil(prompt_rtt * 30)))),
+        "read_timeout": int(min(120, max(10, math.ceil(show_seconds * 10)))),
+        "fast_cli": True,
+        "prompt_pattern": re.escape(base) + r"[>#]",
+    }
+
+
+# -----------------------------------------
+# Connections & Helpers
+# -----------------------------------------
+def resolve_device(device_name: Optional[str] = None) -> str:
+    """
+    Return the inventory name for ``device_name`` (or the default device).
+    """
+    ensure_inventory()
+    if not DEVICES:
+        raise RuntimeError("Device inventory not loaded.")
+    name = device_name or default_device_name()
+    if name not in DEVICES:
+        raise ValueError(f"Unknown device: {name}")
+    return name
+
+
+def resolve_targets(
+    devices: Union[List[str], str, None] = None,
+    group: Optional[str] = None,
+    selector: Optional[str] = None,
+) -> List[str]:
+    """
+    Expand a device list, a group name, a selector (see parse_selector) or
+    "all" into inventory names; the union is returned in inventory order
+    for selectors and request order otherwise. With none given, every device
+    is targeted.
+    """
+    ensure_inventory()
+    if not DEVICES:
+        raise RuntimeError("Device inventory not loaded.")
+    if isinstance(devices, str):
+        devices = [devices]
+    if devices and any(d.lower() == "all" for d in devices):
+        return list(DEVICES.keys())
+    if not devices and not group and not selector:
+        return list(DEVICES.keys())
+    names: List[str] = []
+    if selector:
+        names.extend(DEVICES.select(selector))
+    if group:
+        if group not in GROUPS:
+            raise ValueError(f"Unknown group: {group}")
+        names.extend(GROUPS[group])
+    if devices:
+        unknown = [n for n in devices if n not in DEVICES]
+        if unknown:
+            raise ValueError(f"Unknown device(s): {', '.join(unknown)}")
+        names.extend(devices)
+    # de-duplicate, keep order
+    return list(dict.fromkeys(names))
+
+
+def ConnectHandler(**kwargs):
+    # netmiko (and paramiko/cryptography under it) is imported on the first
+    # connection rather than at start-up; later calls hit sys.modules
+    from netmiko import ConnectHandler as netmiko_connect
+
+    return netmiko_connect(**kwargs)
+
+
+def get_connection(device_name: Optional[str] = None):
+    """
+    Open a Netmiko connection using credentials from DEVICES.
+    """
+    name = resolve_device(device_name)
+    dev = DEVICES[name]
+
+    secret = dev.get("secret")
+    timing = device_timing(name)
+    kwargs = {}
+    if secret:
+        kwargs["secret"] = secret
+    if timing.get("global_delay_factor") is not None:
+        kwargs["global_delay_factor"] = timing["global_delay_factor"]
+    conn = ConnectHandler(
+        device_type=dev.get("device_type", "cisco_ios"),
+        host=dev["host"],
+        username=dev["username"],
+        password=dev["password"],
+        port=int(dev.get("port", 22)),
+        conn_timeout=timing["conn_timeout"],
+        fast_cli=timing["fast_cli"],
+        **kwargs,
+    )
+    # read_timeout / prompt_pattern apply per command, see send_command
+    conn.mcp_timing = timing
+    if secret:
+        enter_enable(conn)
+    else:
+        conn.mcp_privileged = None  # not tracked: nothing to elevate with
+    anchor_prompt(conn)
+    return conn
+
+
+# Prompt anchoring: without an expect_string, netmiko's send_command re-reads
+# the prompt (find_prompt: a round trip plus a settle sleep) before every
+# command. Netmiko's session preparation already sets 'terminal width 511'
+# and 'terminal length 0' and learns the base prompt once per login, so each
+# pooled session reuses that prompt as the pattern every command reads up to.
+PROMPT_TERMINATOR = r"[>#]"
+
+
+def anchor_prompt(conn) -> None:
+    """
+    Cache the expect_string for ``conn``'s commands: the timing profile's
+    prompt_pattern, else its base prompt followed by either terminator (so a
+    drop to user exec still matches; IOS truncates long base prompts). The
+    prompt must fill the last line of the output read so far, so output text
+    such as 'description link R1->R2' does not end the read early.
+    """
+    pattern = (getattr(conn, "mcp_timing", None) or {}).get("prompt_pattern")
+    conn.mcp_expect = pattern or r"(?m)^" + re.escape(conn.base_prompt) + r"[^\s>#]*" + PROMPT_TERMINATOR + r"\s*\Z"
+
+
+# Enable-mode state is cached per session in ``conn.mcp_privileged``: a
+# session is elevated once at login and only re-checked when a command's
+# output looks like it ran in user exec (a mode drop, e.g. after 'disable').
+_MODE_DROP_MARKERS = ("% Invalid input detected", "% Authorization failed", "Failed to enter configuration mode")
+
+
+def enter_enable(conn) -> None:
+    """
+    Bring ``conn`` to privileged exec: one prompt read, and enable() without
+    its own redundant mode check only when the prompt does not end in '#'.
+    """
+    if read_prompt(conn).rstrip().endswith("#"):
+        conn.mcp_privileged = True
+        return
+    conn.enable(check_state=False)
+    conn.mcp_privileged = True
+
+
+def _recover_enable(conn, text: str) -> bool:
+    """
+    True when ``text`` came from a session that had dropped out of enable
+    mode and it has been re-elevated, i.e. the command is worth one retry.
+    """
+    if not getattr(conn, "mcp_privileged", None) or not any(m in text for m in _MODE_DROP_MARKERS):
+        return False
+    if read_prompt(conn).rstrip().endswith("#"):
+        return False  # still privileged: a genuine command error
+    log.info("Session to %s dropped out of enable mode, re-entering", getattr(conn, "host", "?"))
+    conn.mcp_privileged = False
+    conn.enable(check_state=False)
+    conn.mcp_privileged = True
+    return True
+
+
+def read_prompt(conn) -> str:
+    # read up to the terminator rather than sleeping for the prompt to settle
+    pattern = (getattr(conn, "mcp_timing", None) or {}).get("prompt_pattern")
+    return conn.find_prompt(pattern=pattern or PROMPT_TERMINATOR)
+
+
+def send_command(conn, command: str, **kwargs) -> str:
+    """
+    conn.send_command anchored on the session's cached prompt (see
+    anchor_prompt) and with its timing profile's read_timeout, retried once
+    after re-entering enable mode if the session had dropped out of it.
+    """
+    timing = getattr(conn, "mcp_timing", None) or {}
+    if "read_timeout" not in kwargs and timing.get("read_timeout") is not None:
+        kwargs["read_timeout"] = timing["read_timeout"]
+    if "expect_string" not in kwargs and getattr(conn, "mcp_expect", None):
+        kwargs["expect_string"] = conn.mcp_expect
+    output = conn.send_command(command, **kwargs)
+    if _recover_enable(conn, output):
+        output = conn.send_command(command, **kwargs)
+    return output
+
+
+def send_config(conn, commands: List[str]) -> str:
+    try:
+        return conn.send_config_set(commands)
+    except ValueError as e:
+        # netmiko raises ValueError when 'configure terminal' is refused
+        if not _recover_enable(conn, str(e)):
+            raise
+    return conn.send_config_set(commands)
+
+
+# -----------------------------------------
+# Connection Pool
+# -----------------------------------------
+POOL_IDLE_TTL: float = 300.0
+POOL_MAX_PER_DEVICE: int = 2
+POOL_ACQUIRE_TIMEOUT: float = 60.0
+# How often the reaper thread closes sessions idle past the TTL
+POOL_REAP_INTERVAL: float = 30.0
+
+
+def _session_alive(conn) -> bool:
+    try:
+        return bool(conn.is_alive())
+    except Exception:
+        return False
+
+
+def _close_quietly(conn) -> None:
+    try:
+        conn.disconnect()
+    except Exception:
+        pass
+
+
+class ConnectionPool:
+    """
+    Authenticated, already-enabled Netmiko sessions kept alive per device name.
+
+    A session is borrowed by exactly one caller at a time. Idle sessions are
+    closed after ``idle_ttl`` seconds, at most ``max_per_device`` sessions are
+    open per device (further borrowers wait), and idle sessions are probed
+    before reuse; a dead channel is dropped and replaced by a fresh login.
+    A daemon reaper, started with the first idle session, also closes expired
+    sessions when no further calls arrive to do it in acquire().
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = POOL_IDLE_TTL,
+        max_per_device: int = POOL_MAX_PER_DEVICE,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+    ):
+        self.idle_ttl = idle_ttl
+        self.max_per_device = max_per_device
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        # name -> [(conn, last_used)], most recently used last
+        self._idle: Dict[str, List[tuple]] = {}
+        # name -> number of open sessions (idle + borrowed)
+        self._open: Dict[str, int] = {}
+        # name -> epoch; sessions borrowed before close_device() bumped it are
+        # closed on release instead of going back to the idle list
+        self._epochs: Dict[str, int] = {}
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_stop = threading.Event()
+
+    def _expire_locked(self, now: float) -> List[Any]:
+        stale = []
+        for name, idle in self._idle.items():
+            keep = []
+            for conn, last_used in idle:
+                if now - last_used > self.idle_ttl:
+                    stale.append(conn)
+                    self._open[name] -= 1
+                else:
+                    keep.append((conn, last_used))
+            idle[:] = keep
+        if stale:
+            self._cond.notify_all()
+        return stale
+
+    def reap(self) -> int:
+        """Close every idle session past the TTL now; returns how many."""
+        with self._cond:
+            stale = self._expire_locked(time.monotonic())
+        for conn in stale:
+            _close_quietly(conn)
+        return len(stale)
+
+    def _reap_loop(self) -> None:
+        while not self._reaper_stop.wait(min(POOL_REAP_INTERVAL, max(1.0, self.idle_ttl / 2))):
+            try:
+                n = self.reap()
+            except Exception as e:
+                log.warning("Session reaper failed: %s", e)
+                continue
+            if n:
+                log.info("Closed %d idle session(s) past the %.0fs TTL", n, self.idle_ttl)
+
+    def _start_reaper_locked(self) -> None:
+        if self._reaper is None or not self._reaper.is_alive():
+            self._reaper_stop.clear()
+            self._reaper = threading.Thread(target=self._reap_loop, name="pool-reaper", daemon=True)
+            self._reaper.start()
+
+    def _forget(self, name: str, conn) -> None:
+        _close_quietly(conn)
+        with self._cond:
+            self._open[name] = self._open.get(name, 1) - 1
+            self._cond.notify_all()
+
+    def acquire(self, name: str):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            conn = None
+            with self._cond:
+                stale = self._expire_locked(time.monotonic())
+                idle = self._idle.get(name)
+                if idle:
+                    conn, _ = idle.pop()
+                elif self._open.get(name, 0) < self.max_per_device:
+                    self._open[name] = self._open.get(name, 0) + 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError(f"No free session for {name} within {self.acquire_timeout:.0f}s")
+                    self._cond.wait(remaining)
+                    continue
+            for c in stale:
+                _close_quietly(c)
+
+            if conn is None:
+                try:
+                    return get_connection(name)
+                except Exception:
+                    with self._cond:
+                        self._open[name] -= 1
+                        self._cond.notify_all()
+                    raise
+            if _session_alive(conn):
+                return conn
+            # dead channel: drop it and loop round to reconnect
+            self._forget(name, conn)
+
+    def epoch(self, name: str) -> int:
+        with self._cond:
+            return self._epochs.get(name, 0)
+
+    def release(self, name: str, conn, broken: bool = False, epoch: Optional[int] = None) -> None:
+        with self._cond:
+            if not broken and (epoch is None or epoch == self._epochs.get(name, 0)):
+                self._idle.setdefault(name, []).append((conn, time.monotonic()))
+                self._start_reaper_locked()
+                self._cond.notify_all()
+                return
+        self._forget(name, conn)
+
+    @contextmanager
+    def borrow(self, name: str):
+        """
+        Borrow a session for ``name``; it is discarded rather than reused if the
+        caller raises, since the channel may hold unread output.
+        """
+        epoch = self.epoch(name)
+        conn = self.acquire(name)
+        try:
+            yield conn
+        except BaseException:
+            self.release(name, conn, broken=True)
+            raise
+        self.release(name, conn, epoch=epoch)
+
+    def close_device(self, name: str) -> None:
+        """
+        Close ``name``'s idle sessions now and its borrowed ones when they are
+        returned, e.g. after the device was removed or its credentials changed.
+        """
+        with self._cond:
+            self._epochs[name] = self._epochs.get(name, 0) + 1
+            idle = self._idle.pop(name, [])
+            if idle:
+                self._open[name] -= len(idle)
+                self._cond.notify_all()
+        for conn, _ in idle:
+            _close_quietly(conn)
+
+    def close_all(self) -> None:
+        self._reaper_stop.set()
+        with self._cond:
+            idle, self._idle = self._idle, {}
+            for name, sessions in idle.items():
+                self._open[name] -= len(sessions)
+            self._cond.notify_all()
+        for sessions in idle.values():
+            for conn, _ in sessions:
+                _close_quietly(conn)
+
+
+POOL = ConnectionPool()
+
+
+# -----------------------------------------
+# Blocking Device Operations
+# -----------------------------------------
+def _send_show(name: str, command: str, read_timeout: Optional[float] = None) -> str:
+    with POOL.borrow(name) as conn:
+        if read_timeout is None:
+            return send_command(conn, command)
+        return send_command(conn, command, read_timeout=read_timeout)
+
+
+def _verify_brief(conn, interfaces: List[str]) -> Tuple[str, List[Dict[str, str]], List[str]]:
+    """
+    Filtered 'show ip interface brief' for ``interfaces``: (raw, rows of
+    exactly those interfaces, names that have no row).
+    """
+    raw = "\n".join(send_command(conn, cmd) for cmd in _brief_verify_commands(interfaces))
+    # 'include' is a regex match; keep exactly the touched interfaces
+    wanted = set(interfaces)
+    rows = [row for row in parse_show_ip_int_brief(raw) if row["interface"] in wanted]
+    found = {row["interface"] for row in rows}
+    return raw, rows, [n for n in interfaces if n not in found]
+
+
+def _device_interface_name(conn, iface: str) -> Optional[str]:
+    # one short line ('interface GigabitEthernet0/1') instead of the config
+    raw = send_command(conn, f"show running-config interface {iface} | include ^interface")
+    current = parse_running_interface(raw)
+    return current["name"] if current else None
+
+
+def _apply_interface_config(
+    name: str,
+    specs: List[Dict[str, Any]],
+    save: bool,
+    idempotent: bool = False,
+    dry_run: bool = False,
+    full_verify: bool = False,
+) -> Dict[str, Any]:
+    """
+    Plan and push the interface ``specs`` in one borrowed session.
+
+    With ``idempotent`` each interface's running config is read first and only
+    the differing commands are planned; if nothing differs, no config session
+    is opened and nothing is saved or verified. Verification reads only the
+    touched interfaces' rows unless ``full_verify`` asks for the whole table;
+    rows are looked up by the device's spelling of each name (known from the
+    running config in idempotent mode, else asked for when a name such as
+    'Gi0/1' has no row), and only if a row is still missing is the whole
+    table read instead. Returns commands,
+    raw, verify_raw and verify_parsed (None when not verified), verify_full,
+    verify_table (the columnar full table, when read), saved and changed.
+    """
+    with POOL.borrow(name) as conn:
+        cmds: List[str] = []
+        verify_names: List[str] = []
+        for spec in specs:
+            current = None
+            if idempotent:
+                current = parse_running_interface(
+                    send_command(conn, f"show running-config interface {spec['interface']}")
+                )
+            verify_names.append(current["name"] if current else spec["interface"])
+            cmds.extend(_interface_commands(spec, current))
+        if dry_run or not cmds:
+            return {
+                "commands": cmds,
+                "raw": None,
+                "verify_raw": None,
+                "verify_parsed": None,
+                "verify_full": False,
+                "verify_table": None,
+                "saved": False,
+                "changed": bool(cmds),
+            }
+        try:
+            raw = send_config(conn, cmds)
+            if save:
+                raw += "\n" + send_command(conn, "write memory")
+            verify_full = full_verify
+            if not verify_full:
+                verify_raw, verify_parsed, missing = _verify_brief(conn, verify_names)
+                if missing and not idempotent:
+                    spelled = {n: _device_interface_name(conn, n) for n in missing}
+                    verify_names = [spelled.get(n) or n for n in verify_names]
+                    verify_raw, verify_parsed, missing = _verify_brief(conn, verify_names)
+                verify_full = bool(missing)
+            verify_table = None
+            if verify_full:
+                verify_raw = send_command(conn, "show ip interface brief")
+                verify_table = parse_ip_int_brief_table(verify_raw)
+                verify_parsed = ip_int_brief_rows(verify_table)
+        finally:
+            # even a failed push may have applied part of the config
+            SHOW_CACHE.invalidate(name)
+    return {
+        "commands": cmds,
+        "raw": raw,
+        "verify_raw": verify_raw,
+        "verify_parsed": verify_parsed,
+        "verify_full": verify_full,
+        "verify_table": verify_table,
+        "saved": save,
+        "changed": True,
+    }
+
+
+def _calibrate_timing(name: str, samples: int) -> Dict[str, Any]:
+    """
+    Time ``samples`` prompt round trips and one 'show version' on a pooled
+    session; returns the measurements and timing_from_measurements' profile.
+    """
+    with POOL.borrow(name) as conn:
+        rtts = []
+        prompt = ""
+        for _ in range(samples):
+            t0 = time.monotonic()
+            # anchored on the prompt terminator so no fixed settle delay is timed
+            prompt = conn.find_prompt(pattern=PROMPT_TERMINATOR)
+            rtts.append(time.monotonic() - t0)
+        t0 = time.monotonic()
+        send_command(conn, "show version")
+        show_seconds = time.monotonic() - t0
+    rtts.sort()
+    rtt = rtts[len(rtts) // 2]
+    return {
+        "prompt": prompt.strip(),
+        "prompt_rtt_ms": round(rtt * 1000, 1),
+        "show_version_ms": round(show_seconds * 1000, 1),
+        "profile": timing_from_measurements(rtt, show_seconds, prompt),
+    }
+
+
+# -----------------------------------------
+# Async Dispatch
+# -----------------------------------------
+# Netmiko is blocking, so every device operation runs on a dedicated thread
+# pool and the FastMCP event loop only awaits it. Each device additionally
+# has an asyncio semaphore sized like the pool's per-device session cap:
+# callers queue on the event loop (not on a worker thread) until a session is
+# free, and with a cap of 1 all operations on a device are strictly serialized.
+NETMIKO_WORKERS: int = 32
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_DEVICE_SLOTS: Dict[str, asyncio.Semaphore] = {}
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=NETMIKO_WORKERS, thread_name_prefix="netmiko")
+    return _EXECUTOR
+
+
+def _device_slot(name: str) -> asyncio.Semaphore:
+    slot = _DEVICE_SLOTS.get(name)
+    if slot is None:
+        slot = _DEVICE_SLOTS[name] = asyncio.Semaphore(POOL.max_per_device)
+    return slot
+
+
+async def run_on_device(name: str, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Run blocking ``fn(*args, **kwargs)`` for device ``name`` on the Netmiko pool.
+
+    ``timeout`` covers only the device work, not the wait for a free slot. On
+    timeout (or cancellation) the worker thread is left to finish in the
+    background and keeps the device slot until it does, so the next caller
+    queues here rather than on a worker blocked in POOL.acquire.
+    """
+    slot = _device_slot(name)
+    await slot.acquire()
+    try:
+        fut = asyncio.get_running_loop().run_in_executor(_executor(), functools.partial(fn, *args, **kwargs))
+    except BaseException:
+        slot.release()
+        raise
+    fut.add_done_callback(functools.partial(_release_slot, slot))
+    try:
+        # shielded: cancelling the wait must not mark the still-running work done
+        return await asyncio.wait_for(asyncio.shield(fut), timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"Timed out after {timeout:g}s") from None
+
+
+def _release_slot(slot: asyncio.Semaphore, fut: asyncio.Future) -> None:
+    slot.release()
+    if not fut.cancelled():
+        fut.exception()  # retrieved, even when the caller gave up on it
+
+
+# -----------------------------------------
+# Show Output Cache
+# -----------------------------------------
+SHOW_CACHE_TTLS: Dict[str, float] = {
+    "show version": 600.0,
+    "show ip interface brief": 15.0,
+}
+SHOW_CACHE_DEFAULT_TTL: float = 30.0
+SHOW_CACHE_MAX_ENTRIES: int = 1024
+
+
+class ShowCache:
+    """
+    LRU cache of parsed show output keyed by (device, command), with a TTL per
+    command. Every device carries a generation number that ``invalidate`` bumps,
+    so a fetch that started before a config push cannot repopulate the cache
+    with pre-change output.
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        default_ttl: float = SHOW_CACHE_DEFAULT_TTL,
+        max_entries: int = SHOW_CACHE_MAX_ENTRIES,
+    ):
+        self.ttls = dict(SHOW_CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+
+    def generation(self, device: str) -> int:
+        with self._lock:
+            return self._generations.get(device, 0)
+
+    def get(self, device: str, command: str) -> Optional[Dict[str, Any]]:
+        key = (device, command)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is None:
+                return None
+            expires, value = hit
+            if time.monotonic() >= expires:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, device: str, command: str, value: Dict[str, Any], generation: Optional[int] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttls.get(command, self.default_ttl)
+        key = (device, command)
+        with self._lock:
+            if generation is not None and generation != self._generations.get(device, 0):
+                return
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, device: str) -> None:
+        with self._lock:
+            self._generations[device] = self._generations.get(device, 0) + 1
+            for key in [k for k in self._entries if k[0] == device]:
+                del self._entries[key]
+
+
+SHOW_CACHE = ShowCache()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls: the first caller for a key runs
+    ``fn`` and later callers await the same future until it settles. The
+    shared call is shielded, so one waiter being cancelled does not cancel it
+    for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def _settle(self, key: Hashable, fut: asyncio.Future) -> None:
+        if self._calls.get(key) is fut:
+            del self._calls[key]
+        if not fut.cancelled():
+            # mark the exception retrieved even if every waiter went away
+            fut.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """
+        ``timeout`` bounds only how long a caller that joined an existing call
+        waits; the caller that starts the call is expected to bound ``fn``.
+        """
+        fut = self._calls.get(key)
+        if fut is None:
+            fut = asyncio.ensure_future(fn())
+            self._calls[key] = fut
+            fut.add_done_callback(functools.partial(self._settle, key))
+        elif timeout is not None:
+            try:
+                return await asyncio.wait_for(asyncio.shield(fut), timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"Timed out after {timeout:g}s") from None
+        return await asyncio.shield(fut)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+SHOW_FLIGHTS = SingleFlight()
+
+
+async def cached_show(
+    name: str,
+    command: str,
+    parser: Callable[[str], Any],
+    fresh: bool = False,
+    timeout: Optional[float] = None,
+) -> Tuple[Dict[str, Any], bool]:
+    """
+    Return ({"raw", "parsed"}, cached) for ``command`` on device ``name``.
+
+    ``fresh`` bypasses the cache but still refreshes it. Concurrent misses for
+    the same (device, command) share one device round trip and one parse;
+    a config push starts a new generation, so callers never join a fetch that
+    began before it.
+    """
+    if not fresh:
+        hit = SHOW_CACHE.get(name, command)
+        if hit is not None:
+            return hit, True
+    generation = SHOW_CACHE.generation(name)
+
+    async def fetch() -> Dict[str, Any]:
+        raw = await run_on_device(name, _send_show, name, command, timeout=timeout, read_timeout=timeout)
+        entry = {"raw": raw, "parsed": parser(raw)}
+        SHOW_CACHE.put(name, command, entry, generation=generation)
+        return entry
+
+    entry = await SHOW_FLIGHTS.do((name, command, generation), fetch, timeout=timeout)
+    return entry, False
 
-import yaml
-from fastmcp import FastMCP
-from netmiko import ConnectHandler
 
 # -----------------------------------------
-# MCP App
+# Fleet Fan-out
 # -----------------------------------------
-mcp = FastMCP("Cisco Simple Interface MCP (YAML Inventory)")
+FANOUT_CONCURRENCY: int = 16
+FANOUT_DEVICE_TIMEOUT: float = 60.0
+
+
+async def fan_out(
+    names: List[str],
+    fn: Callable[[str], Awaitable[Dict[str, Any]]],
+    concurrency: int = FANOUT_CONCURRENCY,
+    on_done: Optional[Callable[[str, Optional[Dict[str, Any]], Optional[str]], Awaitable[None]]] = None,
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """
+    Await ``fn(name)`` for every device, at most ``concurrency`` at once.
+    Returns (results, errors) keyed by device name. ``on_done(name, result,
+    error)`` is awaited as each device finishes; its failures are only logged.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    errors: Dict[str, str] = {}
+    gate = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def one(name: str) -> None:
+        async with gate:
+            try:
+                results[name] = await fn(name)
+            except Exception as e:
+                errors[name] = str(e)
+        if on_done is not None:
+            try:
+                await on_done(name, results.get(name), errors.get(name))
+            except Exception as e:
+                log.warning("Progress callback failed for %s: %s", name, e)
+
+    await asyncio.gather(*(one(n) for n in names))
+    return results, errors
+
+
+def _wants_progress(ctx: Optional[Context]) -> bool:
+    # FastMCP injects ctx into every call; only a request carrying a
+    # progressToken gets notifications, so skip building them otherwise
+    rc = ctx.request_context if ctx is not None else None
+    return rc is not None and (rc.meta or {}).get("progressToken") is not None
+
+
+async def _fan_out_show(
+    command: str,
+    parser: Callable[[str], Any],
+    devices: Union[List[str], str, None],
+    group: Optional[str],
+    selector: Optional[str],
+    concurrency: int,
+    timeout: float,
+    fresh: bool,
+    shape: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ctx: Optional[Context] = None,
+) -> dict:
+    names = resolve_targets(devices, group, selector)
+    timeout = float(timeout)
+    finished = 0
+
+    async def report(name: str, result: Optional[Dict[str, Any]], error: Optional[str]) -> None:
+        # notifications/progress; the message carries this device's result as JSON
+        nonlocal finished
+        finished += 1
+        payload = {"device": name, "error": error} if error is not None else {"device": name, "result": result}
+        await ctx.report_progress(finished, len(names), json.dumps(payload))
+
+    async def fetch(name: str) -> Dict[str, Any]:
+        # per-device timeout covers the device work, not the wait for a slot
+        entry, cached = await cached_show(name, command, parser, fresh=fresh, timeout=timeout)
+        parsed = shape(entry) if shape else entry["parsed"]
+        return {"raw": entry["raw"], "parsed": parsed, "cached": cached}
+
+    results, errors = await fan_out(
+        names, fetch, concurrency=int(concurrency), on_done=report if _wants_progress(ctx) else None
+    )
+    return {
+        "command": command,
+        "devices": names,
+        # keep inventory order rather than completion order
+        "results": {n: results[n] for n in names if n in results},
+        "errors": {n: errors[n] for n in names if n in errors},
+    }
+
 
 # -----------------------------------------
-# Inventory Loading
+# Inventory Reload
 # -----------------------------------------
-DEVICES: Dict[str, Dict[str, Any]] = {}
-INVENTORY_PATH: str = "devices.yaml"
+INVENTORY_POLL_INTERVAL: float = 2.0
 
 
-def load_inventory(path: str) -> Dict[str, Dict[str, Any]]:
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Inventory file not found: {path}")
-    with open(path, "r") as f:
-        data = yaml.safe_load(f) or {}
-    devices = data.get("devices") or {}
-    if not isinstance(devices, dict) or not devices:
-        raise ValueError("Inventory must contain a top-level 'devices' mapping with at least one device.")
-    # Basic normalization
-    for name, d in devices.items():
-        if "host" not in d or "username" not in d or "password" not in d:
-            raise ValueError(f"Device '{name}' must include 'host', 'username', and 'password'.")
-        d.setdefault("port", 22)
-        d.setdefault("device_type", "cisco_ios")
-    return devices
+def apply_inventory(devices: Mapping, groups: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """
+    Swap in a freshly parsed inventory and return the diff against the old one.
 
+    DEVICES and GROUPS are replaced wholesale, so a lookup sees either the old
+    or the new inventory, never a mix. Calls already running keep their
+    borrowed sessions; pooled sessions of removed or changed devices are
+    closed once returned, so the next call logs in with the new credentials.
+    A replaced SqliteInventory is not closed here, since calls still running
+    may be partway through a lookup on it; it closes its connection when the
+    last of them drops its reference.
+    """
+    global DEVICES, GROUPS, _DEFERRED_INVENTORY
+    with _INVENTORY_LOCK:
+        if _DEFERRED_INVENTORY is not None:
+            # never opened: nothing pooled or cached to reconcile
+            _DEFERRED_INVENTORY = None
+            DEVICES, GROUPS = devices, groups
+            return {"added": list(devices), "removed": [], "changed": []}
+    old = DEVICES
+    diff = {
+        "added": [n for n in devices if n not in old],
+        "removed": [n for n in old if n not in devices],
+        "changed": [n for n in devices if n in old and devices[n] != old[n]],
+    }
+    DEVICES, GROUPS = devices, groups
+    for name in diff["removed"] + diff["changed"]:
+        POOL.close_device(name)
+        SHOW_CACHE.invalidate(name)
+    for name in diff["removed"]:
+        _DEVICE_SLOTS.pop(name, None)
+    return diff
 
-def default_device_name() -> str:
-    # First device in the inventory
-    return next(iter(DEVICES))
+
+def _inventory_stamp(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def watch_inventory(
+    path: str,
+    interval: float,
+    stop: threading.Event,
+    db_path: Optional[str] = None,
+    last: Optional[Tuple[int, int]] = None,
+) -> None:
+    """
+    Poll ``path`` every ``interval`` seconds and apply it when it changes.
+    A file that fails to parse (e.g. half-written) leaves the inventory as is.
+    """
+    while not stop.wait(interval):
+        stamp = _inventory_stamp(path)
+        if stamp is None or stamp == last:
+            continue
+        last = stamp
+        try:
+            devices, groups = open_inventory(path, db_path)
+        except Exception as e:
+            log.warning("Inventory reload of %s failed, keeping the current one: %s", path, e)
+            continue
+        diff = apply_inventory(devices, groups)
+        log.info(
+            "Inventory reloaded: %d added, %d removed, %d changed",
+            len(diff["added"]),
+            len(diff["removed"]),
+            len(diff["changed"]),
+        )
+
+
+def start_inventory_watcher(path: str, interval: float, db_path: Optional[str] = None) -> threading.Event:
+    stop = threading.Event()
+    # stamp now, not when the thread gets scheduled, so no edit slips through
+    last = _inventory_stamp(path)
+    threading.Thread(
+        target=watch_inventory, args=(path, interval, stop, db_path, last), name="inventory-watcher", daemon=True
+    ).start()
+    return stop
 
 
 # -----------------------------------------
-# Connections & Helpers
+# Session Pre-warm
 # -----------------------------------------
-def get_connection(device_name: Optional[str] = None):
+# Devices marked `prewarm: true` in the inventory, plus those matching
+# PREWARM_SELECTOR (--prewarm), get a pooled session opened in the background
+# once the client's handshake (initialize, or server/discover for clients
+# that skip it) has been answered, so their first call skips SSH + enable.
+# A client that sends neither gets it PREWARM_FALLBACK_DELAY after start-up.
+PREWARM_SELECTOR: Optional[str] = None
+PREWARM_CONCURRENCY: int = 8
+PREWARM_FALLBACK_DELAY: float = 1.0
+
+_PREWARM_LOCK = threading.Lock()
+_PREWARM: Dict[str, Any] = {"state": "idle", "started": None, "finished": None, "devices": {}}
+
+
+def prewarm_targets(selector: Optional[str] = None) -> List[str]:
     """
-    Open a Netmiko connection using credentials from DEVICES.
+    Devices flagged `prewarm: true`, then those matching ``selector``
+    ('all' for every device), without duplicates.
     """
-    if not DEVICES:
-        raise RuntimeError("Device inventory not loaded.")
-    name = device_name or default_device_name()
-    if name not in DEVICES:
-        raise ValueError(f"Unknown device: {name}")
-    dev = DEVICES[name]
+    ensure_inventory()
+    names = DEVICES.prewarm_names()
+    if selector and selector.strip().lower() == "all":
+        names.extend(resolve_targets("all"))
+    elif selector:
+        names.extend(resolve_targets(selector=selector))
+    return list(dict.fromkeys(names))
 
-    conn = ConnectHandler(
-        device_type=dev.get("device_type", "cisco_ios"),
-        host=dev["host"],
-        username=dev["username"],
-        password=dev["password"],
-        port=int(dev.get("port", 22)),
-        conn_timeout=8,
-        fast_cli=True,
-    )
 
-    secret = dev.get("secret")
-    if secret:
-        try:
-            # try current secret if preconfigured in profile
-            conn.enable()
-        except Exception:
-            # set secret explicitly then enable
-            conn.secret = secret
-            conn.enable()
-    return conn
+def _prewarm_set(name: str, **fields: Any) -> None:
+    with _PREWARM_LOCK:
+        _PREWARM["devices"].setdefault(name, {}).update(fields)
 
 
-def send_config(conn, commands: List[str]) -> str:
-    return conn.send_config_set(commands)
+def _prewarm_one(name: str) -> None:
+    _prewarm_set(name, state="warming")
+    t0 = time.monotonic()
+    try:
+        with POOL.borrow(name):
+            pass  # returned to the idle list, logged in and enabled
+    except Exception as e:
+        _prewarm_set(name, state="failed", error=str(e), seconds=round(time.monotonic() - t0, 3))
+    else:
+        _prewarm_set(name, state="ready", seconds=round(time.monotonic() - t0, 3))
+
+
+def run_prewarm(selector: Optional[str] = None, concurrency: Optional[int] = None) -> None:
+    """
+    Open a pooled session to every pre-warm target, ``concurrency`` at a
+    time. Blocking; start_prewarm runs it on a background thread.
+    """
+    try:
+        names = prewarm_targets(selector if selector is not None else PREWARM_SELECTOR)
+    except Exception as e:
+        log.warning("Session pre-warm skipped: %s", e)
+        with _PREWARM_LOCK:
+            _PREWARM.update(state="failed", error=str(e), finished=time.time())
+        return
+    with _PREWARM_LOCK:
+        _PREWARM["devices"] = {name: {"state": "pending"} for name in names}
+    if names:
+        workers = max(1, min(int(concurrency or PREWARM_CONCURRENCY), len(names)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prewarm") as ex:
+            list(ex.map(_prewarm_one, names))
+        counts = prewarm_snapshot()["counts"]
+        log.info("Session pre-warm finished: %d/%d devices ready", counts.get("ready", 0), len(names))
+    with _PREWARM_LOCK:
+        _PREWARM.update(state="done", finished=time.time())
+
+
+def start_prewarm() -> bool:
+    """
+    Start run_prewarm on a daemon thread, once per process.
+    Returns False when it was already started.
+    """
+    with _PREWARM_LOCK:
+        if _PREWARM["state"] != "idle":
+            return False
+        _PREWARM.update(state="running", started=time.time())
+    threading.Thread(target=run_prewarm, name="session-prewarm", daemon=True).start()
+    return True
+
+
+def prewarm_snapshot() -> Dict[str, Any]:
+    with _PREWARM_LOCK:
+        devices = {name: dict(d) for name, d in _PREWARM["devices"].items()}
+        out = {k: v for k, v in _PREWARM.items() if k != "devices"}
+    counts: Dict[str, int] = {}
+    for d in devices.values():
+        counts[d["state"]] = counts.get(d["state"], 0) + 1
+    out.update(total=len(devices), counts=counts, devices=devices)
+    return out
+
+
+class PrewarmOnHandshake(Middleware):
+    """Kick off the session warm-up once the handshake response is on its way."""
+
+    async def _answer_then_prewarm(self, context, call_next):
+        result = await call_next(context)
+        # call_soon: the warm-up thread starts after this response is written
+        asyncio.get_running_loop().call_soon(start_prewarm)
+        return result
+
+    async def on_initialize(self, context, call_next):
+        return await self._answer_then_prewarm(context, call_next)
+
+    async def on_discover(self, context, call_next):
+        return await self._answer_then_prewarm(context, call_next)
+
+
+mcp.add_middleware(PrewarmOnHandshake())
 
 
 # -----------------------------------------
 # Parsers
 # -----------------------------------------
-def parse_show_ip_int_brief(text: str):
-    lines = [l for l in text.splitlines() if l.strip()]
-    if not lines:
-        return []
-    data = []
-    # Cisco variants sometimes include a header; skip first line
-    for line in lines[1:]:
-        parts = line.split()
-        if len(parts) < 6:
+SHOW_IP_INT_BRIEF_COLUMNS: Tuple[str, ...] = ("interface", "ip", "ok", "method", "status", "protocol")
+_YES_NO = frozenset(("YES", "NO"))
+
+
+def parse_show_ip_int_brief(text: str, compact: bool = False):
+    """
+    Parse 'show ip interface brief' in one pass over the rows.
+
+    A row is recognised by its OK? column (YES/NO), so a header or prompt
+    line is skipped wherever it appears. "administratively down" is kept as
+    one status, and a long interface name printed alone with its columns
+    wrapped onto the next line is joined back up. Returns a list of row
+    dicts, or with ``compact`` a columnar {"columns": [...], "rows": [[...]]}
+    that skips building a dict per row.
+    """
+    rows: List[Any] = []
+    add = rows.append
+    wrapped = None
+    for parts in map(str.split, text.splitlines()):
+        n = len(parts)
+        if wrapped is not None and n >= 5 and parts[1] in _YES_NO:
+            parts.insert(0, wrapped)
+            n += 1
+        wrapped = parts[0] if n == 1 else None
+        if n == 7 and parts[4] == "administratively":
+            parts[4:6] = ["administratively " + parts[5]]
+            n = 6
+        if n != 6 or parts[2] not in _YES_NO:
             continue
-        iface, ip, ok, method, status, protocol = parts[:6]
-        data.append(
-            {
-                "interface": iface,
-                "ip": ip,
-                "ok": ok,
-                "method": method,
-                "status": status,
-                "protocol": protocol,
-            }
-        )
-    return data
+        if compact:
+            add(parts)
+        else:
+            iface, ip, ok, method, status, protocol = parts
+            add(
+                {
+                    "interface": iface,
+                    "ip": ip,
+                    "ok": ok,
+                    "method": method,
+                    "status": status,
+                    "protocol": protocol,
+                }
+            )
+    if compact:
+        return {"columns": list(SHOW_IP_INT_BRIEF_COLUMNS), "rows": rows}
+    return rows
+
+
+def parse_ip_int_brief_table(text: str) -> Dict[str, Any]:
+    """
+    Columnar parse, the form 'show ip interface brief' is cached in.
+    """
+    return parse_show_ip_int_brief(text, compact=True)
+
+
+def ip_int_brief_rows(table: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Row dicts from a columnar table (e.g. from the show cache). Unpacking into
+    a dict literal is about twice as fast as dict(zip(columns, row)).
+    """
+    return [
+        {"interface": iface, "ip": ip, "ok": ok, "method": method, "status": status, "protocol": protocol}
+        for iface, ip, ok, method, status, protocol in table["rows"]
+    ]
+
+
+def cached_ip_int_brief_rows(entry: Dict[str, Any]) -> List[Dict[str, str]]:
+    """
+    Row dicts of a cached 'show ip interface brief' entry, built on first use
+    and kept on the entry, so compact-only callers never pay for them.
+    """
+    rows = entry.get("rows")
+    if rows is None:
+        rows = entry["rows"] = ip_int_brief_rows(entry["parsed"])
+    return rows
 
 
 SHOW_VER_HOST_RE = re.compile(r"(?i)^(.+?) uptime is (.+)$")
@@ -143,6 +1858,38 @@ def parse_show_version(raw: str) -> Dict[str, Any]:
     return {"hostname": hostname, "version": version, "uptime": uptime}
 
 
+RUN_IF_IP_RE = re.compile(r"^\s*ip address (\S+) (\S+)(\s+secondary)?\s*$")
+RUN_IF_DESC_RE = re.compile(r"^\s*description (.*?)\s*$")
+
+
+def parse_running_interface(raw: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse 'show running-config interface X'. Returns None when the interface
+    does not exist, else {"name": str, "ip": (addr, mask) | None,
+    "secondary": [...], "shutdown": bool, "description": str | None};
+    "name" is the device's full spelling (X may be abbreviated, e.g. Gi0/1).
+    """
+    head = None if "% Invalid" in raw else re.search(r"(?m)^interface (\S+)", raw)
+    if not head:
+        return None
+    state: Dict[str, Any] = {"name": head.group(1), "ip": None, "secondary": [], "shutdown": False, "description": None}
+    for line in raw.splitlines():
+        m = RUN_IF_IP_RE.match(line)
+        if m:
+            if m.group(3):
+                state["secondary"].append((m.group(1), m.group(2)))
+            else:
+                state["ip"] = (m.group(1), m.group(2))
+            continue
+        m = RUN_IF_DESC_RE.match(line)
+        if m:
+            state["description"] = m.group(1)
+            continue
+        if line.strip() == "shutdown":
+            state["shutdown"] = True
+    return state
+
+
 # -----------------------------------------
 # IP & Input Validation Helpers
 # -----------------------------------------
@@ -178,47 +1925,282 @@ def _validate_loopback_id(n: int) -> int:
     return n
 
 
+# -----------------------------------------
+# Interface Config Planning
+# -----------------------------------------
+# Keep filtered verification commands well inside the IOS CLI line limit.
+VERIFY_CMD_MAX_LEN: int = 200
+
+
+def _brief_verify_commands(interfaces: List[str]) -> List[str]:
+    """
+    'show ip interface brief | include ...' commands that return only the
+    header plus the rows for ``interfaces``, split so no command gets too long.
+    """
+    # '_' is IOS regex for a delimiter (space, start/end of line): netmiko
+    # strips trailing whitespace from the command, so a bare space would be
+    # lost on the last term and '^Gi0/0' would match every Gi0/0.N
+    base = "show ip interface brief | include ^Interface_"
+    cmds: List[str] = []
+    current = base
+    for iface in interfaces:
+        term = f"|^{iface}_"
+        if current != base and len(current) + len(term) > VERIFY_CMD_MAX_LEN:
+            cmds.append(current)
+            current = base
+        current += term
+    cmds.append(current)
+    return cmds
+
+
+def _interface_spec(
+    iface: str,
+    addr: str,
+    netmask: str,
+    replace: bool = True,
+    no_shutdown: bool = True,
+    description: Optional[str] = None,
+) -> Dict[str, Any]:
+    return {
+        "interface": iface,
+        "ip": (addr, netmask),
+        "replace": replace,
+        "no_shutdown": no_shutdown,
+        "description": description,
+    }
+
+
+def _interface_commands(spec: Dict[str, Any], current: Optional[Dict[str, Any]] = None) -> List[str]:
+    """
+    Commands that bring one interface to ``spec``. Without ``current`` (no
+    pre-check, or the interface does not exist yet) the full set is returned;
+    otherwise only what differs, and [] when the interface already matches.
+    """
+    addr, netmask = spec["ip"]
+    body: List[str] = []
+    desc = spec.get("description")
+    if desc and (current is None or current["description"] != desc):
+        body.append(f"description {desc}")
+    ip_matches = (
+        current is not None
+        and current["ip"] == (addr, netmask)
+        and not (spec["replace"] and current["secondary"])
+    )
+    if not ip_matches:
+        if spec["replace"]:
+            body.append("no ip address")
+        body.append(f"ip address {addr} {netmask}")
+    if spec["no_shutdown"] and (current is None or current["shutdown"]):
+        body.append("no shutdown")
+    if not body:
+        return []
+    return [f"interface {spec['interface']}"] + body
+
+
+async def _configure_interfaces(
+    device: Optional[str],
+    specs: List[Dict[str, Any]],
+    save: bool,
+    dry_run: bool,
+    idempotent: bool,
+    full_verify: bool,
+) -> Dict[str, Any]:
+    if dry_run and not idempotent:
+        # plain preview: no device access at all
+        return {
+            "device": device or default_device_name(),
+            "commands": [c for spec in specs for c in _interface_commands(spec)],
+            "raw": None,
+            "parsed": None,
+            "saved": False,
+            "dry_run": True,
+            "changed": True,
+        }
+
+    name = resolve_device(device)
+    res = await run_on_device(name, _apply_interface_config, name, specs, save, idempotent, dry_run, full_verify)
+    parsed = res["verify_parsed"]
+    if res["verify_table"] is not None:
+        SHOW_CACHE.put(
+            name, "show ip interface brief", {"raw": res["verify_raw"], "parsed": res["verify_table"], "rows": parsed}
+        )
+    return {
+        "device": name,
+        "commands": res["commands"],
+        "raw": res["raw"],
+        "parsed": parsed,
+        "saved": res["saved"],
+        "dry_run": dry_run,
+        "changed": res["changed"],
+    }
+
+
 # -----------------------------------------
 # MCP Tools
 # -----------------------------------------
-@mcp.tool(name="list_devices", description="List available device names from the YAML inventory.")
-def list_devices() -> dict:
+@mcp.tool(
+    name="list_devices",
+    description=(
+        "List device names from the inventory, optionally filtered by name prefix, tag or "
+        "selector (e.g. 'site=dc1 and role=edge'). "
+        "With limit, returns one page and a next_cursor to pass back for the next page."
+    ),
+)
+def list_devices(
+    prefix: Optional[str] = None,
+    tag: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    selector: Optional[str] = None,
+) -> dict:
+    try:
+        if limit is not None and int(limit) < 1:
+            raise ValueError("limit must be at least 1.")
+        ensure_inventory()
+        names, next_cursor = DEVICES.page(prefix=prefix, tag=tag, limit=limit, cursor=cursor, selector=selector)
+        return {"devices": names, "next_cursor": next_cursor}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    name="prewarm_status",
+    description=(
+        "Show the background session warm-up: overall state (idle/running/done) and, per device, "
+        "pending/warming/ready/failed with the login time or error."
+    ),
+)
+def prewarm_status() -> dict:
+    try:
+        return prewarm_snapshot()
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    name="calibrate_timing",
+    description=(
+        "Measure a device's prompt round-trip and 'show version' time and derive a Netmiko timing profile "
+        "(global_delay_factor, conn_timeout, read_timeout, prompt_pattern). With save=true (default) it is "
+        "stored in <inventory>.timing.json and used from the device's next login."
+    ),
+)
+async def calibrate_timing(device: Optional[str] = None, samples: int = 5, save: bool = True) -> dict:
     try:
-        return {"devices": list(DEVICES.keys())}
+        name = resolve_device(device)
+        samples = max(1, min(int(samples), 50))
+        result = await run_on_device(name, _calibrate_timing, name, samples)
+        store = None
+        if save:
+            store = save_calibrated_timing(name, result["profile"])
+            # re-login with the new profile on next use
+            POOL.close_device(name)
+        return {"device": name, **result, "saved": save, "store": store, "effective": device_timing(name)}
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool(
     name="get_interfaces",
-    description="Run 'show ip interface brief' and return raw + parsed output for a device.",
+    description=(
+        "Run 'show ip interface brief' and return raw + parsed output for a device. "
+        "Served from a short-lived cache unless fresh=true; compact=true returns columns + rows."
+    ),
 )
-def get_interfaces(device: Optional[str] = None) -> dict:
+async def get_interfaces(device: Optional[str] = None, fresh: bool = False, compact: bool = False) -> dict:
     try:
-        conn = get_connection(device)
-        raw = conn.send_command("show ip interface brief")
-        conn.disconnect()
-        return {"device": device or default_device_name(), "raw": raw, "parsed": parse_show_ip_int_brief(raw)}
+        name = resolve_device(device)
+        entry, cached = await cached_show(name, "show ip interface brief", parse_ip_int_brief_table, fresh=fresh)
+        parsed = entry["parsed"] if compact else cached_ip_int_brief_rows(entry)
+        return {"device": name, "raw": entry["raw"], "parsed": parsed, "cached": cached}
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    name="get_version",
+    description="Run 'show version' and return raw + parsed for a device. Served from cache unless fresh=true.",
+)
+async def get_version(device: Optional[str] = None, fresh: bool = False) -> dict:
+    try:
+        name = resolve_device(device)
+        entry, cached = await cached_show(name, "show version", parse_show_version, fresh=fresh)
+        return {"device": name, "raw": entry["raw"], "parsed": entry["parsed"], "cached": cached}
     except Exception as e:
         return {"error": str(e)}
 
 
-@mcp.tool(name="get_version", description="Run 'show version' and return raw + parsed for a device.")
-def get_version(device: Optional[str] = None) -> dict:
+@mcp.tool(
+    name="get_interfaces_many",
+    description=(
+        "Run 'show ip interface brief' concurrently on a device list, a group, a selector "
+        "(e.g. 'site=dc1 and role=edge'), or 'all' "
+        "and return per-device raw + parsed output and errors. compact=true returns columns + rows. "
+        "Each device's result is also streamed as a progress notification when a progressToken is sent."
+    ),
+)
+async def get_interfaces_many(
+    devices: Union[List[str], str, None] = None,
+    group: Optional[str] = None,
+    selector: Optional[str] = None,
+    concurrency: int = FANOUT_CONCURRENCY,
+    timeout: float = FANOUT_DEVICE_TIMEOUT,
+    fresh: bool = False,
+    compact: bool = False,
+    ctx: Optional[Context] = None,
+) -> dict:
     try:
-        conn = get_connection(device)
-        raw = conn.send_command("show version")
-        conn.disconnect()
-        return {"device": device or default_device_name(), "raw": raw, "parsed": parse_show_version(raw)}
+        return await _fan_out_show(
+            "show ip interface brief",
+            parse_ip_int_brief_table,
+            devices,
+            group,
+            selector,
+            concurrency,
+            timeout,
+            fresh,
+            shape=None if compact else cached_ip_int_brief_rows,
+            ctx=ctx,
+        )
+    except Exception as e:
+        return {"error": str(e)}
+
+
+@mcp.tool(
+    name="get_version_many",
+    description=(
+        "Run 'show version' concurrently on a device list, a group, a selector "
+        "(e.g. 'site=dc1 and role=edge'), or 'all' "
+        "and return per-device raw + parsed output and errors. "
+        "Each device's result is also streamed as a progress notification when a progressToken is sent."
+    ),
+)
+async def get_version_many(
+    devices: Union[List[str], str, None] = None,
+    group: Optional[str] = None,
+    selector: Optional[str] = None,
+    concurrency: int = FANOUT_CONCURRENCY,
+    timeout: float = FANOUT_DEVICE_TIMEOUT,
+    fresh: bool = False,
+    ctx: Optional[Context] = None,
+) -> dict:
+    try:
+        return await _fan_out_show(
+            "show version", parse_show_version, devices, group, selector, concurrency, timeout, fresh, ctx=ctx
+        )
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool(
     name="set_interface_ip",
-    description="Set/replace IP on an interface. Verifies with 'show ip interface brief'.",
+    description=(
+        "Set/replace IP on an interface. Verifies the interface's 'show ip interface brief' row "
+        "(full_verify=true returns the whole table). "
+        "With idempotent=true, only pushes what differs from the running config."
+    ),
 )
-def set_interface_ip(
+async def set_interface_ip(
     interface: str,
     ip: str,
     mask: Optional[str] = None,
@@ -227,50 +2209,27 @@ def set_interface_ip(
     no_shutdown: bool = True,
     save: bool = False,
     dry_run: bool = False,
+    idempotent: bool = False,
+    full_verify: bool = False,
 ) -> dict:
     try:
         iface = _validate_interface_name(interface)
         addr, netmask = _norm_ip_and_mask(ip, mask)
-        cmds = [f"interface {iface}"]
-        if replace:
-            cmds.append("no ip address")
-        cmds.append(f"ip address {addr} {netmask}")
-        if no_shutdown:
-            cmds.append("no shutdown")
-
-        if dry_run:
-            return {
-                "device": device or default_device_name(),
-                "commands": cmds,
-                "raw": None,
-                "parsed": None,
-                "saved": False,
-                "dry_run": True,
-            }
-
-        conn = get_connection(device)
-        raw = send_config(conn, cmds)
-        if save:
-            raw += "\n" + conn.send_command("write memory")
-        verify_raw = conn.send_command("show ip interface brief")
-        conn.disconnect()
-        return {
-            "device": device or default_device_name(),
-            "commands": cmds,
-            "raw": raw,
-            "parsed": parse_show_ip_int_brief(verify_raw),
-            "saved": save,
-            "dry_run": False,
-        }
+        spec = _interface_spec(iface, addr, netmask, replace=replace, no_shutdown=no_shutdown)
+        return await _configure_interfaces(device, [spec], save, dry_run, idempotent, full_verify)
     except Exception as e:
         return {"error": str(e)}
 
 
 @mcp.tool(
     name="create_loopback",
-    description="Create a loopback interface with IP. Verifies with 'show ip interface brief'.",
+    description=(
+        "Create a loopback interface with IP. Verifies the loopback's 'show ip interface brief' row "
+        "(full_verify=true returns the whole table). "
+        "With idempotent=true, only pushes what differs from the running config."
+    ),
 )
-def create_loopback(
+async def create_loopback(
     loopback_id: int,
     ip: str,
     mask: Optional[str] = None,
@@ -278,41 +2237,59 @@ def create_loopback(
     description: Optional[str] = None,
     save: bool = False,
     dry_run: bool = False,
+    idempotent: bool = False,
+    full_verify: bool = False,
 ) -> dict:
     try:
         n = _validate_loopback_id(loopback_id)
         addr, netmask = _norm_ip_and_mask(ip, mask)
-        iface = f"Loopback{n}"
-        cmds = [f"interface {iface}"]
-        if description:
-            desc = " ".join(description.splitlines()).strip()
-            cmds.append(f"description {desc}")
-        cmds.append(f"ip address {addr} {netmask}")
-
-        if dry_run:
-            return {
-                "device": device or default_device_name(),
-                "commands": cmds,
-                "raw": None,
-                "parsed": None,
-                "saved": False,
-                "dry_run": True,
-            }
+        desc = " ".join(description.splitlines()).strip() if description else None
+        spec = _interface_spec(f"Loopback{n}", addr, netmask, replace=False, no_shutdown=False, description=desc)
+        return await _configure_interfaces(device, [spec], save, dry_run, idempotent, full_verify)
+    except Exception as e:
+        return {"error": str(e)}
 
-        conn = get_connection(device)
-        raw = send_config(conn, cmds)
-        if save:
-            raw += "\n" + conn.send_command("write memory")
-        verify_raw = conn.send_command("show ip interface brief")
-        conn.disconnect()
-        return {
-            "device": device or default_device_name(),
-            "commands": cmds,
-            "raw": raw,
-            "parsed": parse_show_ip_int_brief(verify_raw),
-            "saved": save,
-            "dry_run": False,
-        }
+
+@mcp.tool(
+    name="set_interfaces_ip_bulk",
+    description=(
+        "Set/replace IPs on several interfaces of one device in a single config session. "
+        "Each item is {interface, ip, mask?}. Saves at most once and verifies the touched rows once "
+        "at the end (full_verify=true returns the whole table). "
+        "With idempotent=true, only pushes what differs from the running config."
+    ),
+)
+async def set_interfaces_ip_bulk(
+    interfaces: List[Dict[str, Any]],
+    device: Optional[str] = None,
+    replace: bool = True,
+    no_shutdown: bool = True,
+    save: bool = False,
+    dry_run: bool = False,
+    idempotent: bool = False,
+    full_verify: bool = False,
+) -> dict:
+    try:
+        if not interfaces:
+            raise ValueError("At least one interface spec is required.")
+        specs: List[Dict[str, Any]] = []
+        for i, item in enumerate(interfaces):
+            try:
+                if not isinstance(item, dict) or "interface" not in item or "ip" not in item:
+                    raise ValueError("expected an object with 'interface' and 'ip'")
+                iface = _validate_interface_name(str(item["interface"]))
+                # JSON callers may send the prefix length as a number
+                mask = item.get("mask")
+                addr, netmask = _norm_ip_and_mask(str(item["ip"]), None if mask is None else str(mask))
+            except ValueError as e:
+                raise ValueError(f"interfaces[{i}]: {e}") from None
+            if any(spec["interface"] == iface for spec in specs):
+                raise ValueError(f"interfaces[{i}]: duplicate interface {iface}")
+            specs.append(_interface_spec(iface, addr, netmask, replace=replace, no_shutdown=no_shutdown))
+
+        result = await _configure_interfaces(device, specs, save, dry_run, idempotent, full_verify)
+        result["interfaces"] = [spec["interface"] for spec in specs]
+        return result
     except Exception as e:
         return {"error": str(e)}
 
@@ -323,12 +2300,81 @@ def create_loopback(
 def _parse_args():
     p = argparse.ArgumentParser(description="Cisco MCP server using YAML inventory.")
     p.add_argument("--inventory", "-i", default="devices.yaml", help="Path to devices YAML (default: devices.yaml)")
+    p.add_argument(
+        "--inventory-db",
+        default=None,
+        help="Serve the inventory from this SQLite file, compiled from the YAML whenever it changes",
+    )
+    p.add_argument(
+        "--no-inventory-snapshot",
+        action="store_true",
+        help="Always parse the YAML instead of reusing its pickled snapshot (<inventory>.pickle)",
+    )
+    p.add_argument(
+        "--watch-interval",
+        type=float,
+        default=INVENTORY_POLL_INTERVAL,
+        help=f"Seconds between inventory change checks, 0 disables reloading (default: {INVENTORY_POLL_INTERVAL:g})",
+    )
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=NETMIKO_WORKERS,
+        help=f"Threads dedicated to blocking Netmiko work (default: {NETMIKO_WORKERS})",
+    )
+    p.add_argument(
+        "--pool-idle-ttl",
+        type=float,
+        default=POOL_IDLE_TTL,
+        help=f"Seconds an idle SSH session is kept open (default: {POOL_IDLE_TTL:.0f})",
+    )
+    p.add_argument(
+        "--pool-max-per-device",
+        type=int,
+        default=POOL_MAX_PER_DEVICE,
+        help=f"Maximum concurrent SSH sessions per device (default: {POOL_MAX_PER_DEVICE})",
+    )
+    p.add_argument(
+        "--prewarm",
+        metavar="SELECTOR",
+        default=None,
+        help="Open sessions in the background at start-up for devices matching this selector, or 'all' "
+        "(devices marked 'prewarm: true' are always warmed)",
+    )
+    p.add_argument(
+        "--prewarm-concurrency",
+        type=int,
+        default=PREWARM_CONCURRENCY,
+        help=f"Parallel logins during warm-up (default: {PREWARM_CONCURRENCY})",
+    )
+    p.add_argument(
+        "--show-cache-size",
+        type=int,
+        default=SHOW_CACHE_MAX_ENTRIES,
+        help=f"Max cached show outputs, 0 disables caching (default: {SHOW_CACHE_MAX_ENTRIES})",
+    )
     return p.parse_args()
 
 
 if __name__ == "__main__":
     args = _parse_args()
     INVENTORY_PATH = args.inventory
-    DEVICES = load_inventory(INVENTORY_PATH)
-    mcp.run()
+    INVENTORY_DB_PATH = args.inventory_db
+    INVENTORY_SNAPSHOT = not args.no_inventory_snapshot
+    defer_inventory(INVENTORY_PATH, INVENTORY_DB_PATH)
+    POOL.idle_ttl = args.pool_idle_ttl
+    POOL.max_per_device = max(1, args.pool_max_per_device)
+    NETMIKO_WORKERS = max(1, args.workers)
+    SHOW_CACHE.max_entries = args.show_cache_size
+    PREWARM_SELECTOR = args.prewarm
+    PREWARM_CONCURRENCY = max(1, args.prewarm_concurrency)
+    watcher = None
+    if args.watch_interval > 0:
+        watcher = start_inventory_watcher(INVENTORY_PATH, args.watch_interval, INVENTORY_DB_PATH)
+    try:
+        mcp.run()
+    finally:
+        if watcher is not None:
+            watcher.set()
+        POOL.close_all()
 
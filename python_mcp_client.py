@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
-import json, subprocess, threading, time, os, sys, re, ipaddress
+import asyncio, itertools, json, logging, subprocess, threading, time, os, sys, re, ipaddress
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout, as_completed, wait
 from pathlib import Path
 
 # ----------------------------------------------------
@@ -7,11 +9,28 @@ from pathlib import Path
 # ----------------------------------------------------
 SERVER_CMD = ["python3", "mcp_server.py", "--inventory", "devices.yaml"]
 
+log = logging.getLogger("mcp_client")
+
+# Fast JSON decoding for the reader: orjson when installed, stdlib otherwise.
+# Both accept bytes, so frames are decoded straight from the binary pipe.
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:  # pragma: no cover - optional dependency
+    json_loads = json.loads
+
+READ_BUFFER = 1 << 20  # stdout buffer; fleet results can be several MB per line
+SERVER_LOG_KEEP = 500  # recent server stderr lines kept in memory
+
+STRAY_KEEP = 100         # most recent unmatched messages kept for debugging
+ABANDONED_KEEP = 1024    # timed-out/cancelled ids remembered to tell "late" from "unknown"
+
 # ====================================================
 #                  MCP Wire Client
 # ====================================================
 class MCPClient:
-    def __init__(self, cmd, env=None):
+    def __init__(self, cmd, env=None, decoder=None):
         env_final = os.environ.copy()
         if env:
             env_final.update(env)
@@ -20,33 +39,129 @@ class MCPClient:
             cwd=str(Path(__file__).parent),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
+            stderr=subprocess.PIPE,  # logs on their own pipe; stdout carries only JSON-RPC
+            bufsize=READ_BUFFER,
             env=env_final,
         )
+        self.server_log = deque(maxlen=SERVER_LOG_KEEP)
+        self._loads = decoder or json_loads  # any callable taking bytes -> object
         self._qid = 0
-        self.responses = {}
+        self._id_lock = threading.Lock()
+        self._send_lock = threading.Lock()  # one JSON line on stdin at a time
+        self._pending = {}  # request id -> Future completed by _reader
+        self._progress_handlers = {}  # progressToken -> callback(params)
+        self.on_notification = None   # optional callback(msg) for other server notifications
+        self._stats_lock = threading.Lock()
+        self._counts = Counter()
+        self._abandoned = OrderedDict()  # bounded: ids whose waiter gave up
+        self.stray = deque(maxlen=STRAY_KEEP)
         threading.Thread(target=self._reader, daemon=True).start()
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
+
+    def _drain_stderr(self):
+        # keep the server's stderr pipe empty so its logging never blocks it
+        for line in self.proc.stderr:
+            s = line.rstrip().decode(errors="replace")
+            if not s:
+                continue
+            self.server_log.append(s)
+            # surface warnings/errors printed by the server
+            if "WARNING" in s or "ERROR" in s:
+                print(s)
 
     def _reader(self):
+        loads = self._loads
         for line in self.proc.stdout:
             s = line.strip()
             if not s:
                 continue
-            try:
-                msg = json.loads(s)
-            except Exception:
-                # surface warnings/errors printed by the server
-                if "WARNING" in s or "ERROR" in s:
-                    print(s)
+            # JSON-RPC frames are objects; anything else is log noise, not worth a decode attempt
+            msg = None
+            if s[:1] == b"{":
+                try:
+                    msg = loads(s)
+                except Exception:
+                    pass
+            if not isinstance(msg, dict):
+                self.server_log.append("[stdout] " + s.decode(errors="replace"))
                 continue
             if "id" in msg and ("result" in msg or "error" in msg):
-                self.responses[msg["id"]] = msg
+                # complete the waiter directly; responses nobody waits for are dropped
+                fut = self._pending.pop(msg["id"], None)
+                try:
+                    if fut is None:
+                        raise InvalidStateError
+                    fut.set_result(msg)
+                    self._count("completed")
+                except InvalidStateError:
+                    self._orphan(msg)
+            elif msg.get("method") == "notifications/progress":
+                params = msg.get("params") or {}
+                handler = self._progress_handlers.get(params.get("progressToken"))
+                if handler:
+                    try:
+                        handler(params)
+                    except Exception as e:
+                        print(f"⚠️  Progress handler failed: {e}")
+                else:
+                    self.stray.append(msg)
+            elif "method" in msg and self.on_notification:
+                try:
+                    self.on_notification(msg)
+                except Exception as e:
+                    print(f"⚠️  Notification handler failed: {e}")
+            else:
+                self.stray.append(msg)
+        # stdout closed: fail outstanding requests now instead of at their timeout
+        for rid in list(self._pending):
+            fut = self._pending.pop(rid, None)
+            if fut is not None:
+                try:
+                    fut.set_exception(ConnectionError("MCP server closed stdout"))
+                except InvalidStateError:
+                    pass
 
     def _next_id(self):
-        self._qid += 1
-        return self._qid
+        with self._id_lock:
+            self._qid += 1
+            return self._qid
+
+    def _count(self, key, n=1):
+        with self._stats_lock:
+            self._counts[key] += n
+
+    def _settle(self, rid, fut):
+        # done-callback of every request future: drop the id, remember abandoned ones
+        self._pending.pop(rid, None)
+        if fut.cancelled():
+            with self._stats_lock:
+                self._counts["abandoned"] += 1
+                self._abandoned[rid] = None
+                if len(self._abandoned) > ABANDONED_KEEP:
+                    self._abandoned.popitem(last=False)
+
+    def _orphan(self, msg):
+        rid = msg.get("id")
+        with self._stats_lock:
+            late = self._abandoned.pop(rid, 0) is None
+            self._counts["orphaned"] += 1
+            self._counts["late" if late else "unknown"] += 1
+        self.stray.append(msg)
+        log.warning("Dropped %s response id=%r", "late" if late else "unmatched", rid)
+
+    def stats(self):
+        """Request bookkeeping counters: outstanding, completed, abandoned, orphaned (late/unknown)."""
+        with self._stats_lock:
+            out = {k: self._counts[k] for k in ("completed", "abandoned", "orphaned", "late", "unknown")}
+        out["outstanding"] = len(self._pending)
+        out["stray_kept"] = len(self.stray)
+        return out
+
+    def _write(self, obj):
+        line = (json.dumps(obj) + "\n").encode()
+        with self._send_lock:
+            self.proc.stdin.write(line)
+            self.proc.stdin.flush()
 
     def send(self, method, params=None, *, msg_id=None):
         if msg_id is None:
@@ -54,25 +169,59 @@ class MCPClient:
         obj = {"jsonrpc": "2.0", "id": msg_id, "method": method}
         if params is not None:
             obj["params"] = params
-        self.proc.stdin.write(json.dumps(obj) + "\n")
-        self.proc.stdin.flush()
+        self._write(obj)
         return msg_id
 
+    def request_async(self, method, params=None):
+        """
+        Send a request without waiting; returns a Future resolved with the
+        response message. Safe to call from many threads at once.
+        """
+        rid = self._next_id()
+        fut = Future()
+        fut.rpc_id = rid
+        self._pending[rid] = fut  # register before sending so a fast reply can't be missed
+        fut.add_done_callback(lambda f, rid=rid: self._settle(rid, f))
+        try:
+            self.send(method, params, msg_id=rid)
+        except Exception:
+            fut.cancel()
+            raise
+        return fut
+
     def request(self, method, params=None, timeout=25):
-        rid = self.send(method, params)
-        t0 = time.time()
-        while time.time() - t0 < timeout:
-            if rid in self.responses:
-                return self.responses.pop(rid)
-            time.sleep(0.02)
-        raise TimeoutError(f"Timeout waiting for {method}")
+        fut = self.request_async(method, params)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            fut.cancel()
+            raise TimeoutError(f"Timeout waiting for {method}") from None
+
+    def gather(self, futures, timeout=None):
+        """
+        Wait for request_async futures; returns their results in input order.
+        Failed calls yield their exception; calls still pending at the timeout
+        are cancelled and yield TimeoutError.
+        """
+        futures = list(futures)
+        wait(futures, timeout=timeout)
+        out = []
+        for fut in futures:
+            if not fut.done():
+                fut.cancel()
+                out.append(TimeoutError(f"Timeout waiting for request {getattr(fut, 'rpc_id', '?')}"))
+            elif fut.cancelled():
+                out.append(TimeoutError(f"Request {getattr(fut, 'rpc_id', '?')} cancelled"))
+            else:
+                exc = fut.exception()
+                out.append(exc if exc is not None else fut.result())
+        return out
 
     def notify(self, method, params=None):
         obj = {"jsonrpc": "2.0", "method": method}
         if params is not None:
             obj["params"] = params
-        self.proc.stdin.write(json.dumps(obj) + "\n")
-        self.proc.stdin.flush()
+        self._write(obj)
 
     def close(self):
         try:
@@ -80,6 +229,246 @@ class MCPClient:
         except Exception:
             pass
 
+# ====================================================
+#               Asyncio MCP Wire Client
+# ====================================================
+class AsyncMCPClient:
+    """
+    Same wire protocol as MCPClient on a single event loop: one reader task
+    routes responses to futures by id, writes await stdin drain().
+
+        async with AsyncMCPClient(SERVER_CMD) as client:
+            await client.initialize()
+            data = await client.call_tool("get_version", {"device": "R1"})
+    """
+    STREAM_LIMIT = 16 * 1024 * 1024  # stdout buffer; longer lines are read in chunks
+
+    def __init__(self, cmd, env=None, decoder=None):
+        self.cmd = list(cmd)
+        self._loads = decoder or json_loads
+        self.env = os.environ.copy()
+        if env:
+            self.env.update(env)
+        self.proc = None
+        self._ids = itertools.count(1)
+        self._pending = {}  # request id -> asyncio.Future
+        self._progress_handlers = {}  # progressToken -> callback(params)
+        self.on_notification = None   # optional callback(msg)
+        self._reader_task = None
+        self._stderr_task = None
+        self._closed = None  # why requests can no longer be answered, once they can't
+        self._counts = Counter()
+        self.stray = deque(maxlen=STRAY_KEEP)
+        self.server_log = deque(maxlen=SERVER_LOG_KEEP)
+
+    async def start(self):
+        self.proc = await asyncio.create_subprocess_exec(
+            *self.cmd,
+            cwd=str(Path(__file__).parent),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=self.env,
+            limit=self.STREAM_LIMIT,
+        )
+        self._reader_task = asyncio.create_task(self._reader())
+        self._stderr_task = asyncio.create_task(self._drain_stderr())
+        return self
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _drain_stderr(self):
+        while True:
+            line = await self.proc.stderr.readline()
+            if not line:
+                break
+            s = line.rstrip().decode(errors="replace")
+            if s:
+                self.server_log.append(s)
+                if "WARNING" in s or "ERROR" in s:
+                    print(s)
+
+    async def _read_line(self):
+        """
+        The next stdout line, b"" at EOF. Unlike readline(), a line longer
+        than STREAM_LIMIT is collected in chunks instead of raising.
+        """
+        stdout = self.proc.stdout
+        chunks = []
+        while True:
+            try:
+                chunks.append(await stdout.readuntil(b"\n"))
+                break
+            except asyncio.LimitOverrunError as e:
+                chunks.append(await stdout.readexactly(e.consumed))
+            except asyncio.IncompleteReadError as e:
+                chunks.append(e.partial)
+                break
+        return b"".join(chunks)
+
+    async def _reader(self):
+        reason = "MCP server closed stdout"
+        try:
+            while True:
+                line = await self._read_line()
+                if not line:
+                    break
+                s = line.strip()
+                if not s:
+                    continue
+                msg = None
+                if s[:1] == b"{":
+                    try:
+                        msg = self._loads(s)
+                    except Exception:
+                        pass
+                if not isinstance(msg, dict):
+                    self.server_log.append("[stdout] " + s.decode(errors="replace"))
+                    continue
+                if "id" in msg and ("result" in msg or "error" in msg):
+                    fut = self._pending.pop(msg["id"], None)
+                    if fut is not None and not fut.done():
+                        fut.set_result(msg)
+                        self._counts["completed"] += 1
+                    else:
+                        self._counts["orphaned"] += 1
+                        self.stray.append(msg)
+                        log.warning("Dropped unmatched response id=%r", msg["id"])
+                elif msg.get("method") == "notifications/progress":
+                    params = msg.get("params") or {}
+                    handler = self._progress_handlers.get(params.get("progressToken"))
+                    if handler:
+                        try:
+                            handler(params)
+                        except Exception as e:
+                            print(f"⚠️  Progress handler failed: {e}")
+                    else:
+                        self.stray.append(msg)
+                elif "method" in msg and self.on_notification:
+                    try:
+                        self.on_notification(msg)
+                    except Exception as e:
+                        print(f"⚠️  Notification handler failed: {e}")
+                else:
+                    self.stray.append(msg)
+        except Exception as e:
+            reason = f"MCP client stopped reading stdout: {e}"
+            log.warning(reason)
+        finally:
+            # fail new requests at once instead of leaving them unanswered
+            self._closed = self._closed or reason
+            for rid in list(self._pending):
+                fut = self._pending.pop(rid, None)
+                if fut is not None and not fut.done():
+                    fut.set_exception(ConnectionError(self._closed))
+
+    async def _write(self, obj):
+        self.proc.stdin.write((json.dumps(obj) + "\n").encode())
+        await self.proc.stdin.drain()  # backpressure when the server stops reading
+
+    async def request(self, method, params=None, timeout=None):
+        """
+        Send a request and await its response. On timeout or task
+        cancellation the id is dropped and the server is sent
+        notifications/cancelled. Raises ConnectionError once the client is
+        closed or its stdout reader has stopped.
+        """
+        if self._closed:
+            raise ConnectionError(self._closed)
+        rid = next(self._ids)
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[rid] = fut
+        obj = {"jsonrpc": "2.0", "id": rid, "method": method}
+        if params is not None:
+            obj["params"] = params
+        try:
+            await self._write(obj)
+            return await asyncio.wait_for(fut, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as e:
+            if self._pending.pop(rid, None) is not None:
+                self._counts["abandoned"] += 1
+                reason = "timeout" if isinstance(e, asyncio.TimeoutError) else "cancelled"
+                try:
+                    await self.notify("notifications/cancelled", {"requestId": rid, "reason": reason})
+                except Exception:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError(f"Timeout waiting for {method}") from None
+            raise
+        finally:
+            self._pending.pop(rid, None)
+
+    async def notify(self, method, params=None):
+        obj = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            obj["params"] = params
+        await self._write(obj)
+
+    def stats(self):
+        """Request bookkeeping counters: outstanding, completed, abandoned, orphaned."""
+        out = {k: self._counts[k] for k in ("completed", "abandoned", "orphaned")}
+        out["outstanding"] = len(self._pending)
+        out["stray_kept"] = len(self.stray)
+        return out
+
+    async def initialize(self, client_name="py-mcp-client", timeout=30):
+        init = await self.request(
+            "initialize",
+            {
+                "protocolVersion": "2025-03-26",
+                "capabilities": {"tools": {}},
+                "clientInfo": {"name": client_name, "version": "1.0"},
+            },
+            timeout=timeout,
+        )
+        await self.notify("notifications/initialized", {})
+        return init
+
+    async def call_tool(self, tool_name, arguments=None, timeout=90, on_progress=None):
+        """Call a tool and return its merged JSON payload (see call_tool_raw)."""
+        params = {"name": tool_name, "arguments": arguments or {}}
+        token = None
+        if on_progress:
+            token = f"{tool_name}-{time.monotonic_ns()}"
+            params["_meta"] = {"progressToken": token}
+            self._progress_handlers[token] = on_progress
+        try:
+            call = await self.request("tools/call", params, timeout=timeout)
+        finally:
+            if token is not None:
+                self._progress_handlers.pop(token, None)
+        return _tool_payload(tool_name, call)
+
+    async def close(self):
+        if self.proc is None:
+            return
+        self._closed = self._closed or "MCP client closed"
+        try:
+            self.proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.proc.terminate()
+        except ProcessLookupError:
+            pass
+        try:
+            await asyncio.wait_for(self.proc.wait(), 5)
+        except asyncio.TimeoutError:
+            self.proc.kill()
+            await self.proc.wait()
+        for task in (self._reader_task, self._stderr_task):
+            if task is None:
+                continue
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
 # ====================================================
 #               Tool Call / Result Helpers
 # ====================================================
@@ -113,18 +502,31 @@ def _merge_content_blocks(call_result):
 
     return merged if found_any else {}
 
-def call_tool_raw(client, tool_name, arguments=None, timeout=90):
+def call_tool_raw(client, tool_name, arguments=None, timeout=90, on_progress=None):
+    """
+    on_progress(params) is called from the reader thread for each
+    notifications/progress the server sends for this call.
+    """
     arguments = arguments or {}
-    call = client.request("tools/call", {"name": tool_name, "arguments": arguments}, timeout=timeout)
+    params = {"name": tool_name, "arguments": arguments}
+    token = None
+    if on_progress:
+        token = f"{tool_name}-{time.monotonic_ns()}"
+        params["_meta"] = {"progressToken": token}
+        client._progress_handlers[token] = on_progress
+    try:
+        call = client.request("tools/call", params, timeout=timeout)
+    finally:
+        if token is not None:
+            client._progress_handlers.pop(token, None)
+    return _tool_payload(tool_name, call)
+
+def _tool_payload(tool_name, call):
     if "error" in call:
         raise RuntimeError(f"Tool '{tool_name}' error: {call['error']}")
     return _merge_content_blocks(call)
 
-def call_tool_norm(client, tool_name, arguments=None, timeout=90):
-    """
-    Normalized output for pretty printing (ensures keys exist) + version recovery.
-    """
-    data = call_tool_raw(client, tool_name, arguments, timeout)
+def _normalize(tool_name, data):
     for k in ["raw", "parsed", "commands", "saved", "dry_run", "device", "error"]:
         data.setdefault(k, None)
     # If this is a get_version payload and parsed.version is missing, try to recover from raw
@@ -132,6 +534,36 @@ def call_tool_norm(client, tool_name, arguments=None, timeout=90):
         _recover_version_inplace(data)
     return data
 
+def call_tool_norm(client, tool_name, arguments=None, timeout=90):
+    """
+    Normalized output for pretty printing (ensures keys exist) + version recovery.
+    """
+    return _normalize(tool_name, call_tool_raw(client, tool_name, arguments, timeout))
+
+def call_tool_each_device(client, tool_name, names, timeout=90):
+    """
+    Fire tool_name for every device at once over the same pipe and yield
+    (name, normalized data, error) in completion order.
+    """
+    futs = {
+        client.request_async("tools/call", {"name": tool_name, "arguments": {"device": n}}): n
+        for n in names
+    }
+    try:
+        for fut in as_completed(futs, timeout=timeout):
+            name = futs[fut]
+            try:
+                yield name, _normalize(tool_name, _tool_payload(tool_name, fut.result())), None
+            except Exception as e:
+                yield name, None, e
+    except FutureTimeout:
+        for fut, name in futs.items():
+            if not fut.done():
+                yield name, None, TimeoutError(f"Timeout waiting for {tool_name}")
+    finally:
+        for fut in futs:
+            fut.cancel()  # no-op for finished calls; drops the rest from _pending
+
 # ---------------- Version Recovery (Client-side) ----------------
 _VERSION_PATTERNS = [
     r"(?i)Cisco IOS XE Software,\s*Version\s+([^,\n]+)",
@@ -194,6 +626,8 @@ def pretty_print_tool(name, data):
         print(f"\n💾 Saved to NVRAM: {bool(data['saved'])}")
     if data.get("dry_run") is not None:
         print(f"🧪 Dry run: {bool(data['dry_run'])}")
+    if data.get("changed") is not None:
+        print(f"🔁 Changed: {bool(data['changed'])}")
 
 # ====================================================
 #                   Input Helpers
@@ -370,6 +804,7 @@ def wizard_set_interface_ip(client):
     no_shutdown = prompt_bool("Send 'no shutdown'?", os.getenv("NO_SHUT", "1") == "1")
     save = prompt_bool("Save config (write memory)?", os.getenv("SAVE", "0") == "1")
     dry_run = prompt_bool("Dry run (preview only)?", os.getenv("DRY_RUN", "1") == "1")
+    idempotent = prompt_bool("Only push what differs from the running config?", os.getenv("IDEMPOTENT", "0") == "1")
 
     args = {
         "interface": iface,
@@ -378,6 +813,7 @@ def wizard_set_interface_ip(client):
         "no_shutdown": no_shutdown,
         "save": save,
         "dry_run": dry_run,
+        "idempotent": idempotent,
     }
     if mask:
         args["mask"] = mask
@@ -390,6 +826,50 @@ def wizard_set_interface_ip(client):
         return wizard_set_interface_ip(client)
     return args
 
+def wizard_set_interfaces_ip_bulk(client):
+    print("\n🔧 set_interfaces_ip_bulk — guided setup (one config session)")
+    sel = pick_device_or_all(client, allow_all=False, prompt_label="Device")
+    if sel["mode"] == "cancel":
+        return None
+
+    specs = []
+    print("ℹ️  Enter one interface per entry; leave Interface empty to finish.")
+    while True:
+        iface = prompt_str(f"Interface #{len(specs) + 1}", allow_empty=True)
+        if not iface:
+            if specs:
+                break
+            print("Please enter at least one interface.")
+            continue
+        ip_in, mask = prompt_ip_with_optional_mask("10.10.10.1/24")
+        spec = {"interface": iface, "ip": ip_in}
+        if mask:
+            spec["mask"] = mask
+        specs.append(spec)
+
+    replace = prompt_bool("Replace existing IPs on the interfaces?", os.getenv("REPLACE", "1") == "1")
+    no_shutdown = prompt_bool("Send 'no shutdown'?", os.getenv("NO_SHUT", "1") == "1")
+    save = prompt_bool("Save config once at the end (write memory)?", os.getenv("SAVE", "0") == "1")
+    dry_run = prompt_bool("Dry run (preview only)?", os.getenv("DRY_RUN", "1") == "1")
+    idempotent = prompt_bool("Only push what differs from the running config?", os.getenv("IDEMPOTENT", "0") == "1")
+
+    args = {
+        "interfaces": specs,
+        "replace": replace,
+        "no_shutdown": no_shutdown,
+        "save": save,
+        "dry_run": dry_run,
+        "idempotent": idempotent,
+    }
+    if sel.get("device"):
+        args["device"] = sel["device"]
+
+    print("\n📋 Review arguments:")
+    print(json.dumps(args, indent=2))
+    if not prompt_bool("Proceed with these settings?", True):
+        return wizard_set_interfaces_ip_bulk(client)
+    return args
+
 def wizard_create_loopback(client):
     print("\n🔧 create_loopback — guided setup")
     sel = pick_device_or_all(client, allow_all=False, prompt_label="Device")
@@ -402,6 +882,7 @@ def wizard_create_loopback(client):
     desc = prompt_str("Description", os.getenv("LOOPBACK_DESC", "MCP-created loopback"), allow_empty=True)
     save = prompt_bool("Save config (write memory)?", os.getenv("SAVE", "0") == "1")
     dry_run = prompt_bool("Dry run (preview only)?", os.getenv("DRY_RUN", "1") == "1")
+    idempotent = prompt_bool("Only push what differs from the running config?", os.getenv("IDEMPOTENT", "0") == "1")
 
     args = {
         "loopback_id": loop_id,
@@ -409,6 +890,7 @@ def wizard_create_loopback(client):
         "description": desc,
         "save": save,
         "dry_run": dry_run,
+        "idempotent": idempotent,
     }
     if mask:
         args["mask"] = mask
@@ -516,18 +998,18 @@ if __name__ == "__main__":
                     names = sel["names"]
                     combined_raw = []
                     combined_parsed = []
-                    print("\n▶️  Running 'get_interfaces' on ALL devices ...")
-                    for name in names:
-                        try:
-                            data = call_tool_norm(client, "get_interfaces", {"device": name}, timeout=90)
-                            pretty_print_tool("get_interfaces", data)
-                            r = data.get("raw") or ""
-                            p = data.get("parsed")
-                            combined_raw.append(f"=== {name} ===\n{r}\n")
-                            combined_parsed.append({"device": name, "parsed": p})
-                        except Exception as e:
-                            print(f"❌ {name}: {e}")
-                            combined_parsed.append({"device": name, "error": str(e)})
+                    print("\n▶️  Running 'get_interfaces' on ALL devices (in parallel) ...")
+                    # every call is in flight at once; results print as they complete
+                    for name, data, err in call_tool_each_device(client, "get_interfaces", names, timeout=90):
+                        if err is not None:
+                            print(f"❌ {name}: {err}")
+                            combined_parsed.append({"device": name, "error": str(err)})
+                            continue
+                        pretty_print_tool("get_interfaces", data)
+                        r = data.get("raw") or ""
+                        p = data.get("parsed")
+                        combined_raw.append(f"=== {name} ===\n{r}\n")
+                        combined_parsed.append({"device": name, "parsed": p})
 
                     print("\n=== 📦 Aggregated (all devices) ===")
                     print("\n📡 RAW (combined):\n")
@@ -558,18 +1040,18 @@ if __name__ == "__main__":
                     names = sel["names"]
                     combined_raw = []
                     combined_parsed = []
-                    print("\n▶️  Running 'get_version' on ALL devices ...")
-                    for name in names:
-                        try:
-                            data = call_tool_norm(client, "get_version", {"device": name}, timeout=90)
-                            pretty_print_tool("get_version", data)  # recovery runs in call_tool_norm/pretty_print
-                            r = data.get("raw") or ""
-                            p = data.get("parsed")
-                            combined_raw.append(f"=== {name} ===\n{r}\n")
-                            combined_parsed.append({"device": name, "parsed": p})
-                        except Exception as e:
-                            print(f"❌ {name}: {e}")
-                            combined_parsed.append({"device": name, "error": str(e)})
+                    print("\n▶️  Running 'get_version' on ALL devices (in parallel) ...")
+                    # every call is in flight at once; results print as they complete
+                    for name, data, err in call_tool_each_device(client, "get_version", names, timeout=90):
+                        if err is not None:
+                            print(f"❌ {name}: {err}")
+                            combined_parsed.append({"device": name, "error": str(err)})
+                            continue
+                        pretty_print_tool("get_version", data)  # recovery runs in call_tool_norm/pretty_print
+                        r = data.get("raw") or ""
+                        p = data.get("parsed")
+                        combined_raw.append(f"=== {name} ===\n{r}\n")
+                        combined_parsed.append({"device": name, "parsed": p})
 
                     print("\n=== 📦 Aggregated (all devices) ===")
                     print("\n📡 RAW (combined):\n")
@@ -586,6 +1068,51 @@ if __name__ == "__main__":
                         print(f"❌ Tool call failed: {e}")
                 continue
 
+            # get_interfaces_many / get_version_many — server-side fan-out in one call
+            if selected in ("get_interfaces_many", "get_version_many"):
+                target = prompt_str("Devices (comma-separated), 'all', 'g:<group>' or 's:<selector>'", "all")
+                args = {}
+                if target.startswith("g:"):
+                    args["group"] = target[2:].strip()
+                elif target.startswith("s:"):
+                    args["selector"] = target[2:].strip()  # e.g. s:site=dc1 and role=edge
+                elif target.lower() != "all":
+                    args["devices"] = [t.strip() for t in target.split(",") if t.strip()]
+                print(f"\n▶️  Running '{selected}' with {args or {'devices': 'all'}} ...")
+                single = selected[: -len("_many")]
+                shown = set()
+
+                def show_progress(params, single=single, shown=shown):
+                    # each progress message carries one device's result as it completes
+                    try:
+                        item = json.loads(params.get("message") or "")
+                    except ValueError:
+                        return
+                    name = item.get("device")
+                    total = params.get("total")
+                    print(f"\n⏳ {params.get('progress')}/{total if total is not None else '?'} {name}")
+                    if "error" in item:
+                        print(f"❌ {name}: {item['error']}")
+                    else:
+                        pretty_print_tool(single, dict(item.get("result") or {}, device=name))
+                    shown.add(name)
+
+                try:
+                    data = call_tool_raw(client, selected, args, timeout=300, on_progress=show_progress)
+                    if data.get("error"):
+                        print(f"❌ Server error: {data['error']}")
+                        continue
+                    for name, res in (data.get("results") or {}).items():
+                        if name not in shown:
+                            pretty_print_tool(single, dict(res, device=name))
+                    for name, err in (data.get("errors") or {}).items():
+                        if name not in shown:
+                            print(f"❌ {name}: {err}")
+                    print(f"\n✅ {len(data.get('results') or {})} ok, {len(data.get('errors') or {})} failed")
+                except Exception as e:
+                    print(f"❌ Tool call failed: {e}")
+                continue
+
             # 4) set_interface_ip — guided wizard (single device)
             if selected == "set_interface_ip":
                 args = wizard_set_interface_ip(client)
@@ -598,6 +1125,18 @@ if __name__ == "__main__":
                     print(f"❌ Tool call failed: {e}")
                 continue
 
+            # set_interfaces_ip_bulk — guided wizard (single device, many interfaces)
+            if selected == "set_interfaces_ip_bulk":
+                args = wizard_set_interfaces_ip_bulk(client)
+                if args is None:  # canceled
+                    continue
+                try:
+                    data = call_tool_norm(client, "set_interfaces_ip_bulk", args, timeout=180)
+                    pretty_print_tool("set_interfaces_ip_bulk", data)
+                except Exception as e:
+                    print(f"❌ Tool call failed: {e}")
+                continue
+
             # 5) create_loopback — guided wizard (single device) with graceful fallback
             if selected == "create_loopback":
                 args = wizard_create_loopback(client)